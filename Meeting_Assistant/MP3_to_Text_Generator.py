@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydub import AudioSegment
 import speech_recognition as sr
 
@@ -9,11 +10,13 @@ def convert_mp3_to_text(mp3_file_path):
     Args:
         mp3_file_path (str): Path to the MP3 file.
     """
+    # A unique temporary file, so several recordings can be converted at once
+    fd, wav_file_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
     try:
         # Convert MP3 to WAV
         print("Converting MP3 to WAV...")
         audio = AudioSegment.from_mp3(mp3_file_path)
-        wav_file_path = "temp.wav"
         audio.export(wav_file_path, format="wav")
 
         # Recognize speech from the WAV file
@@ -24,9 +27,6 @@ def convert_mp3_to_text(mp3_file_path):
             text = recognizer.recognize_google(audio_data)
             print("Transcription:\n", text)
 
-        # Clean up temporary file
-        os.remove(wav_file_path)
-
         return text
         
     except FileNotFoundError:
@@ -34,4 +34,8 @@ def convert_mp3_to_text(mp3_file_path):
     except sr.UnknownValueError:
         print("Sorry, I could not understand the audio.")
     except sr.RequestError as e:
-        print(f"Could not request results: {e}")
\ No newline at end of file
+        print(f"Could not request results: {e}")
+    finally:
+        # Clean up temporary file
+        if os.path.exists(wav_file_path):
+            os.remove(wav_file_path)
\ No newline at end of file
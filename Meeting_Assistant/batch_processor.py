@@ -0,0 +1,108 @@
+# batch_processor.py
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def find_recordings(patterns: list) -> list:
+    """
+    Expand directories and glob patterns into a sorted list of MP3 files.
+
+    Args:
+        patterns (list): Files, directories (searched for *.mp3) or glob patterns.
+    """
+    recordings = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            recordings.update(glob.glob(os.path.join(pattern, "*.mp3")))
+        else:
+            recordings.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(recordings)
+
+
+class _Manifest:
+    """Append-only JSON Lines manifest, one record per recording."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record: dict):
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def run_batch(recordings, transcribe, extract, dispatch, meeting_id, manifest_path="meeting_manifest.jsonl",
+              transcribe_workers=2, extract_workers=4, sink_workers=2, max_in_flight=None) -> list:
+    """
+    Process many recordings with overlapping stages.
+
+    Every stage has its own bounded pool, so while one recording is being
+    transcribed, the tasks of another are being extracted and the outputs of a
+    third are being sent to the sinks.
+
+    Args:
+        recordings (list): Paths of the MP3 files to process.
+        transcribe (callable): path -> meeting notes.
+        extract (callable): meeting notes -> tasks grouped by status.
+        dispatch (callable): (meeting id, tasks) -> list of SinkResult.
+        meeting_id (callable): path -> meeting id.
+        manifest_path (str): JSON Lines file receiving one result record per recording.
+        transcribe_workers (int): Recordings transcribed at the same time.
+        extract_workers (int): Concurrent LLM extraction calls.
+        sink_workers (int): Recordings whose outputs are dispatched at the same time.
+        max_in_flight (int): Recordings in the pipeline at once (defaults to the sum of the pools).
+
+    Returns:
+        list: The manifest records, in the order of `recordings`.
+    """
+    manifest = _Manifest(manifest_path)
+    stages = {
+        "transcribe": ThreadPoolExecutor(transcribe_workers, thread_name_prefix="transcribe"),
+        "extract": ThreadPoolExecutor(extract_workers, thread_name_prefix="extract"),
+        "dispatch": ThreadPoolExecutor(sink_workers, thread_name_prefix="dispatch"),
+    }
+    max_in_flight = max_in_flight or transcribe_workers + extract_workers + sink_workers
+
+    def run_stage(record, stage, func, *args):
+        start = time.perf_counter()
+        try:
+            return stages[stage].submit(func, *args).result()
+        finally:
+            record["timings"][stage] = round(time.perf_counter() - start, 3)
+
+    def process(path):
+        record = {"file": path, "meeting_id": meeting_id(path), "status": "ok", "timings": {}}
+        try:
+            notes = run_stage(record, "transcribe", transcribe, path)
+            tasks = run_stage(record, "extract", extract, notes)
+            record["tasks"] = {status: len(task_list) for status, task_list in tasks.items()}
+            results = run_stage(record, "dispatch", dispatch, record["meeting_id"], tasks)
+            record["sinks"] = {result.name: result.ok for result in results}
+            if not all(record["sinks"].values()):
+                record["status"] = "partial"
+        except Exception as e:
+            record["status"] = "error"
+            record["failed_stage"] = list(record["timings"])[-1] if record["timings"] else None
+            record["error"] = f"{type(e).__name__}: {e}"
+        manifest.write(record)
+        print(f"[{record['status']}] {path}")
+        return record
+
+    print(f"Processing {len(recordings)} recording(s)...")
+    start = time.perf_counter()
+    try:
+        # The driver threads only wait on the stage pools, which bound the real work
+        with ThreadPoolExecutor(max_in_flight, thread_name_prefix="meeting") as drivers:
+            records = list(drivers.map(process, recordings))
+    finally:
+        for executor in stages.values():
+            executor.shutdown()
+
+    failed = sum(record["status"] != "ok" for record in records)
+    print(f"Processed {len(records)} recording(s) in {time.perf_counter() - start:.1f}s, "
+          f"{failed} with errors. Manifest written to {manifest_path}")
+    return records
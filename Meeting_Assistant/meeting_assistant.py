@@ -7,7 +7,6 @@ from langchain.tools import tool
 from langchain.schema import AgentAction, AgentFinish
 from langchain_core.messages import AIMessage
 
-import pandas as pd
 from trello import TrelloClient
 
 import os
@@ -28,10 +27,15 @@ trello_client = TrelloClient(
     api_secret=TRELLO_API_TOKEN
 )
 
-import tkinter as tk
-from tkinter import filedialog
-
 def get_file_path():
+    # Imported here so batch mode can run on a server without a display
+    import tkinter as tk
+    from tkinter import filedialog
+
+    # Create a Tkinter window
+    root = tk.Tk()
+    root.withdraw()  # Hide the root window
+
     # Open file dialog to select a file
     file_path = filedialog.askopenfilename(
         title="Open the Meeting Transcript (MP3)", 
@@ -39,17 +43,14 @@ def get_file_path():
         )
     return file_path
 
-# Create a Tkinter window
-root = tk.Tk()
-root.withdraw()  # Hide the root window
-
-# Open file dialog and process the file
-mp3_file_path = get_file_path()
-
-from mp3_to_text import convert_mp3_to_text
+from MP3_to_Text_Generator import convert_mp3_to_text
 
 # convert mp3 to text meeting notes
-meeting_notes = convert_mp3_to_text(mp3_file_path)
+def transcribe_meeting(mp3_file_path: str) -> str:
+    meeting_notes = convert_mp3_to_text(mp3_file_path)
+    if not meeting_notes:
+        raise RuntimeError(f"Could not transcribe {mp3_file_path}")
+    return meeting_notes
 
 # @tool("load_meeting_notes", return_direct=True)
 # def load_meeting_notes(file_path: str) -> str:
@@ -66,129 +67,49 @@ meeting_notes = convert_mp3_to_text(mp3_file_path)
 # meeting_notes = load_meeting_notes.invoke(file_path)
 # print(meeting_notes)  # Verify loaded notes
 
-# Prompt template for extracting tasks
-task_prompt = PromptTemplate(
-    input_variables=["meeting_notes"],
-    template="""You are an assistant tasked with extracting actionable tasks from meeting notes.
-    You should categorize tasks into three groups:
-    - **To-Do**: Tasks that need to be completed.
-    - **Doing**: Tasks that are currently in progress.
-    - **Done**: Tasks that have been completed.
-
-    Please output the tasks in a **JSON-like format** for each category. Example:
-    {{
-        "To-Do": [
-            "Set up Stripe to manage the subscription model with three tiers: Basic, Pro, and Enterprise.",
-            "Define the exact breakdown for each subscription tier in terms of features and pricing."
-        ],
-        "Doing": [
-            "Jordan is working on the frontend tasks, including the checkout process and user notifications.",
-            "Taylor is focusing on the backend setup, integrating Stripe's API, and setting up webhook handlers."
-        ],
-        "Done": [
-            "The meeting notes have been extracted to identify actionable tasks.",
-            "The subscription tiers, features, and pricing have been defined."
-        ]
-    }}
-
-    Meeting Notes:
-    {meeting_notes}
-    """
-)
-
-import re
-import json
-
-def parse_tasks(output: str):
-    # Define regular expressions for each task category
-    to_do_pattern = r'"To-Do":\s*\[(.*?)\],'
-    doing_pattern = r'"Doing":\s*\[(.*?)\],'
-    done_pattern = r'"Done":\s*\[(.*?)\]'
-
-    # Use re.search() to extract the task lists as strings
-    to_do_tasks = re.search(to_do_pattern, output, re.DOTALL)
-    doing_tasks = re.search(doing_pattern, output, re.DOTALL)
-    done_tasks = re.search(done_pattern, output, re.DOTALL)
-
-    # Extract tasks from each category and clean up the results
-    to_do_tasks = re.findall(r'"(.*?)"', to_do_tasks.group(1)) if to_do_tasks else []
-    doing_tasks = re.findall(r'"(.*?)"', doing_tasks.group(1)) if doing_tasks else []
-    done_tasks = re.findall(r'"(.*?)"', done_tasks.group(1)) if done_tasks else []
-
-    # Return the tasks in a dictionary format
-    return {
-        "To-Do": to_do_tasks,
-        "Doing": doing_tasks,
-        "Done": done_tasks
-    }
-
-parser = StrOutputParser()
-
-# LLM Chain for task generation
-generate_tasks_chain = task_prompt | llama_model | parser
+from task_extraction import build_task_extractor
 
-# Function to generate tasks
-def generate_tasks(notes: str) -> list:
-    response = generate_tasks_chain.invoke({"meeting_notes": notes})
-    # print(response)
-    return parse_tasks(response)
-    # return response
-
-tasks = generate_tasks(meeting_notes)
-# print(tasks)  # Verify generated tasks
+# Function to generate tasks, grouped by status
+generate_tasks = build_task_extractor(llama_model)
 
 BOARD_ID = "675310b78bfa02bada2dce16"
 TO_DO = "675310b73297b35ec2144e9f"
 DOING = "675310b85b7ddad518384b7f"
 DONE = "675310b8a29eea7c444568bb"
 
-# Function to add tasks to Trello lists
-def add_tasks_to_trello(tasks: dict):
-    # Get the Trello board and lists
-    board = trello_client.get_board(BOARD_ID)
-    to_do_list = board.get_list(TO_DO)
-    doing_list = board.get_list(DOING)
-    done_list = board.get_list(DONE)
-
-    # Add To-Do tasks to the corresponding Trello list
-    for task in tasks.get("To-Do", []):
-        to_do_list.add_card(name=task)
-
-    # Add Doing tasks to the corresponding Trello list
-    for task in tasks.get("Doing", []):
-        doing_list.add_card(name=task)
-
-    # Add Done tasks to the corresponding Trello list
-    for task in tasks.get("Done", []):
-        done_list.add_card(name=task)
-
-    print("Tasks added to Trello successfully!")
-
-# Call the function with the tasks parsed from meeting notes
-add_tasks_to_trello(tasks)
+from trello_sync import TrelloSync
 
-import csv
+trello_sync = TrelloSync(
+    trello_client,
+    BOARD_ID,
+    {"To-Do": TO_DO, "Doing": DOING, "Done": DONE}
+)
 
-def save_tasks_to_csv(tasks):
-    # Define the CSV file name
-    csv_file = 'new_tasks.csv'
+# Function to add tasks to Trello lists, skipping tasks that already have a card
+def add_tasks_to_trello(tasks: dict):
+    result = trello_sync.sync(tasks)
+    if result['failed']:
+        # Safe to retry: cards that were created are skipped next time
+        raise RuntimeError(f"{result['failed']} card(s) could not be added to Trello")
+    print(f"Tasks added to Trello successfully! "
+          f"({result['created']} created, {result['moved']} moved, {result['skipped']} already on the board)")
 
-    # Check if the file exists, if not create it and add headers
-    file_exists = os.path.isfile(csv_file)
+from task_store import TaskStore
 
-    with open(csv_file, mode='a', newline='') as file:
-        writer = csv.writer(file)
+task_store = TaskStore("tasks.db")
 
-        # Write headers only if file is new
-        if not file_exists:
-            writer.writerow(['Task', 'Category'])
+import hashlib
 
-        # Write tasks to the CSV file
-        for category, task_list in tasks.items():
-            for task in task_list:
-                writer.writerow([task, category])
+# Identify the meeting by its recording name plus a hash of its full path,
+# so recordings with the same name in different directories stay apart
+def get_meeting_id(mp3_file_path: str) -> str:
+    name = os.path.splitext(os.path.basename(mp3_file_path))[0]
+    path_hash = hashlib.sha1(os.path.abspath(mp3_file_path).encode("utf-8")).hexdigest()[:8]
+    return f"{name}-{path_hash}"
 
-    print(f"Tasks saved to {csv_file}")
+def save_tasks_to_store(meeting_id, tasks):
+    count = task_store.add_tasks(meeting_id, tasks)
+    print(f"{count} tasks saved to {task_store.db_path}")
 
 import requests
 
@@ -200,19 +121,69 @@ def send_discord_notification(tasks):
     for category, task_list in tasks.items():
         message += f"\n**{category}:**\n"
         for task in task_list:
-            message += f"- {task}\n"
+            owner = f" ({task.assignee})" if task.assignee else ""
+            message += f"- {task.title}{owner}\n"
 
     # Send the notification
     payload = {'content': message}
-    response = requests.post(webhook_url, json=payload)
+    response = requests.post(webhook_url, json=payload, timeout=10)
 
     if response.status_code == 204:
         print("Discord notification sent successfully!")
     else:
-        print(f"Failed to send notification. Status code: {response.status_code}")
-
-# Save tasks to CSV
-save_tasks_to_csv(tasks)
-
-# Send Discord notification
-send_discord_notification(tasks)     
\ No newline at end of file
+        raise RuntimeError(f"Failed to send notification. Status code: {response.status_code}")
+
+from functools import partial
+from output_dispatcher import FunctionSink, dispatch_outputs
+
+# Destinations for the extracted tasks; add more sinks here
+def build_output_sinks(meeting_id: str) -> list:
+    return [
+        FunctionSink("trello", add_tasks_to_trello, timeout=60),
+        FunctionSink("store", partial(save_tasks_to_store, meeting_id), timeout=10, retries=1),
+        # Not retried: a post that failed on a slow response may still have been delivered
+        FunctionSink("discord", send_discord_notification, timeout=15, retries=0),
+    ]
+
+# Add tasks to Trello, save them to the task store and send the Discord notification concurrently
+def dispatch_meeting_outputs(meeting_id: str, tasks: dict) -> list:
+    return dispatch_outputs(tasks, build_output_sinks(meeting_id))
+
+def process_meeting(mp3_file_path: str) -> list:
+    meeting_notes = transcribe_meeting(mp3_file_path)
+    tasks = generate_tasks(meeting_notes)
+    # print(tasks)  # Verify generated tasks
+    return dispatch_meeting_outputs(get_meeting_id(mp3_file_path), tasks)
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Extract tasks from meeting recordings.")
+    arg_parser.add_argument("recordings", nargs="*",
+                            help="MP3 files, directories or glob patterns to process headless. "
+                                 "Opens a file dialog when omitted.")
+    arg_parser.add_argument("--manifest", default="meeting_manifest.jsonl",
+                            help="Per-file result manifest written in batch mode.")
+    arg_parser.add_argument("--transcribe-workers", type=int, default=2)
+    arg_parser.add_argument("--extract-workers", type=int, default=4)
+    arg_parser.add_argument("--sink-workers", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    if args.recordings:
+        from batch_processor import find_recordings, run_batch
+
+        run_batch(
+            find_recordings(args.recordings),
+            transcribe=transcribe_meeting,
+            extract=generate_tasks,
+            dispatch=dispatch_meeting_outputs,
+            meeting_id=get_meeting_id,
+            manifest_path=args.manifest,
+            transcribe_workers=args.transcribe_workers,
+            extract_workers=args.extract_workers,
+            sink_workers=args.sink_workers,
+        )
+    else:
+        # Open file dialog and process the file
+        mp3_file_path = get_file_path()
+        process_meeting(mp3_file_path)
\ No newline at end of file
@@ -0,0 +1,103 @@
+# output_dispatcher.py
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+class OutputSink(ABC):
+    """
+    A destination for the extracted meeting tasks (Trello, the task store, Discord, ...).
+
+    Subclasses implement send(); it should raise on failure so the dispatcher
+    can retry it. A send that times out is not retried: its thread cannot be
+    stopped and may still deliver, so a retry could post the tasks twice.
+    """
+    name = "sink"
+    timeout = 30.0   # seconds allowed per attempt
+    retries = 2      # extra attempts after a failure (not after a timeout)
+    backoff = 1.0    # seconds before the first retry, doubled every retry
+
+    @abstractmethod
+    def send(self, tasks: dict):
+        ...
+
+
+class FunctionSink(OutputSink):
+    """Wrap an existing function such as save_tasks_to_store as a sink."""
+
+    def __init__(self, name: str, func: Callable[[dict], object], timeout=30.0, retries=2, backoff=1.0):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def send(self, tasks: dict):
+        return self.func(tasks)
+
+
+@dataclass
+class SinkResult:
+    name: str
+    ok: bool
+    attempts: int
+    elapsed: float
+    error: Optional[str] = None
+
+
+async def _run_sink(loop, executor, sink: OutputSink, tasks: dict) -> SinkResult:
+    start = time.perf_counter()
+    error = None
+    for attempt in range(1, sink.retries + 2):
+        try:
+            await asyncio.wait_for(loop.run_in_executor(executor, sink.send, tasks), sink.timeout)
+            return SinkResult(sink.name, True, attempt, time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            # The send keeps running in its thread; retrying could deliver the tasks twice
+            error = f"timed out after {sink.timeout}s (not retried, the send may still complete)"
+            return SinkResult(sink.name, False, attempt, time.perf_counter() - start, error)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if attempt <= sink.retries:
+            await asyncio.sleep(sink.backoff * 2 ** (attempt - 1))
+    return SinkResult(sink.name, False, sink.retries + 1, time.perf_counter() - start, error)
+
+
+async def _dispatch(tasks: dict, sinks: List[OutputSink]) -> List[SinkResult]:
+    loop = asyncio.get_running_loop()
+    # A dedicated pool so a sink that hangs past its timeout does not hold a thread of the
+    # loop's default executor. Its thread is still joined when the interpreter exits.
+    executor = ThreadPoolExecutor(max_workers=max(1, len(sinks)))
+    try:
+        return await asyncio.gather(*(_run_sink(loop, executor, sink, tasks) for sink in sinks))
+    finally:
+        executor.shutdown(wait=False)
+
+
+def dispatch_outputs(tasks: dict, sinks: List[OutputSink]) -> List[SinkResult]:
+    """
+    Send the tasks to every sink concurrently.
+
+    Each sink gets its own timeout and retries; a failing sink does not affect
+    the others. Sends that time out are reported as failed without a retry.
+
+    Args:
+        tasks (dict): Tasks grouped by status, as returned by generate_tasks.
+        sinks (list): The OutputSink instances to send to.
+
+    Returns:
+        list: One SinkResult per sink, in the order of `sinks`.
+    """
+    results = asyncio.run(_dispatch(tasks, sinks))
+    print_summary(results)
+    return results
+
+
+def print_summary(results: List[SinkResult]):
+    print("\nOutput summary:")
+    for result in results:
+        status = "ok" if result.ok else f"FAILED ({result.error})"
+        print(f"  {result.name:<10} {status} - {result.attempts} attempt(s), {result.elapsed:.2f}s")
@@ -0,0 +1,207 @@
+# task_extraction.py
+import hashlib
+import json
+import re
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+CATEGORIES = ("To-Do", "Doing", "Done")
+
+
+class MeetingTask(BaseModel):
+    """A single actionable task extracted from the meeting notes."""
+    title: str = Field(description="Short, self-contained description of the task.")
+    assignee: Optional[str] = Field(default=None, description="Person responsible for the task, if mentioned.")
+    status: Literal["To-Do", "Doing", "Done"] = Field(description="One of 'To-Do', 'Doing' or 'Done'.")
+    due_date: Optional[str] = Field(default=None, description="Due date as mentioned in the meeting (ISO format if possible).")
+
+
+class MeetingTasks(BaseModel):
+    """All tasks extracted from one meeting."""
+    tasks: List[MeetingTask] = Field(default_factory=list)
+
+
+# Prompt template for extracting tasks as JSON matching the MeetingTasks schema
+task_prompt = PromptTemplate(
+    input_variables=["meeting_notes"],
+    template="""You are an assistant tasked with extracting actionable tasks from meeting notes.
+    Every task has a status:
+    - **To-Do**: Tasks that need to be completed.
+    - **Doing**: Tasks that are currently in progress.
+    - **Done**: Tasks that have been completed.
+
+    Respond with a single JSON object and nothing else, in the following format:
+    {{
+        "tasks": [
+            {{
+                "title": "Set up Stripe to manage the subscription model with three tiers: Basic, Pro, and Enterprise.",
+                "assignee": null,
+                "status": "To-Do",
+                "due_date": null
+            }},
+            {{
+                "title": "Work on the frontend tasks, including the checkout process and user notifications.",
+                "assignee": "Jordan",
+                "status": "Doing",
+                "due_date": "2024-12-20"
+            }}
+        ]
+    }}
+
+    Meeting Notes:
+    {meeting_notes}
+    """
+)
+
+# Prompt used to fix a malformed response without re-reading the meeting notes
+repair_prompt = PromptTemplate(
+    input_variables=["output", "error"],
+    template="""The following text was supposed to be a JSON object of the form
+    {{"tasks": [{{"title": str, "assignee": str or null, "status": "To-Do" | "Doing" | "Done", "due_date": str or null}}]}}
+    but it could not be parsed:
+
+    {output}
+
+    Error: {error}
+
+    Return only the corrected JSON object, keeping the tasks unchanged.
+    """
+)
+
+
+def _strip_to_json(output: str) -> str:
+    """Remove code fences and any text around the outermost JSON object."""
+    output = re.sub(r"```(?:json)?", "", output)
+    start, end = output.find("{"), output.rfind("}")
+    if start == -1 or end == -1:
+        return output.strip()
+    return output[start:end + 1]
+
+
+def _repair_json(output: str) -> str:
+    """Cheap, local fixes for the usual LLM JSON mistakes."""
+    output = _strip_to_json(output)
+    # Trailing commas before a closing bracket or brace
+    output = re.sub(r",\s*([\]}])", r"\1", output)
+    # Missing commas between adjacent objects / strings on separate lines
+    output = re.sub(r'(["}\]])\s*\n\s*(["{])', r"\1,\n\2", output)
+    return output
+
+
+def _from_legacy_format(data: dict) -> dict:
+    """
+    Accept the old {"To-Do": [...], "Doing": [...], "Done": [...]} layout.
+
+    Anything else is returned unchanged for validation to reject; a null
+    category counts as empty and a single title as a one-item list.
+    """
+    if not isinstance(data, dict) or "tasks" in data or not any(category in data for category in CATEGORIES):
+        return data
+    tasks = []
+    for category in CATEGORIES:
+        titles = data.get(category) or []
+        if not isinstance(titles, list):
+            titles = [titles]
+        for title in titles:
+            tasks.append({"title": title, "status": category})
+    return {"tasks": tasks}
+
+
+def parse_tasks(output: str) -> MeetingTasks:
+    """
+    Parse the LLM output into validated MeetingTasks.
+
+    Args:
+        output (str): Raw model output.
+
+    Raises:
+        ValueError: If the output cannot be parsed even after local repair.
+    """
+    errors = []
+    for candidate in (_strip_to_json(output), _repair_json(output)):
+        try:
+            return MeetingTasks.model_validate(_from_legacy_format(json.loads(candidate)))
+        except (json.JSONDecodeError, ValidationError) as e:
+            errors.append(e)
+    raise ValueError(f"Could not parse tasks: {errors[-1]}")
+
+
+def salvage_tasks(output: str) -> MeetingTasks:
+    """
+    Keep the individually valid tasks of an output that does not validate as a whole.
+
+    Returns:
+        MeetingTasks: The valid tasks, empty when the output is not JSON at all.
+    """
+    for candidate in (_strip_to_json(output), _repair_json(output)):
+        try:
+            data = _from_legacy_format(json.loads(candidate))
+        except json.JSONDecodeError:
+            continue
+        items = data.get("tasks") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            continue
+        tasks = []
+        for item in items:
+            try:
+                tasks.append(MeetingTask.model_validate(item))
+            except ValidationError:
+                pass
+        return MeetingTasks(tasks=tasks)
+    return MeetingTasks()
+
+
+def group_tasks(tasks: MeetingTasks) -> dict:
+    """Group the tasks by status, e.g. {"To-Do": [MeetingTask, ...], ...}."""
+    grouped = {category: [] for category in CATEGORIES}
+    for task in tasks.tasks:
+        grouped[task.status].append(task)
+    return grouped
+
+
+def normalize_title(title: str) -> str:
+    """Lower-case the title and drop punctuation and repeated whitespace."""
+    title = re.sub(r"[^\w\s]", " ", title.lower())
+    return " ".join(title.split())
+
+
+def task_key(task: MeetingTask) -> str:
+    """Stable key used to recognise the same task across runs."""
+    return hashlib.sha1(normalize_title(task.title).encode("utf-8")).hexdigest()[:16]
+
+
+def build_task_extractor(llm):
+    """
+    Build a function that extracts tasks from meeting notes with the given LLM.
+
+    The model is asked for JSON output (JSON mode where the provider supports it).
+    If the response does not validate, it is first repaired locally and then, as a
+    last resort, sent back through a short repair prompt that only contains the
+    broken output - the meeting notes are never re-sent. If the repaired output
+    still does not validate, the valid tasks that can be salvaged from it are
+    returned (possibly none) and the error is printed.
+    """
+    json_llm = llm.bind(response_format={"type": "json_object"})
+    generate_tasks_chain = task_prompt | json_llm | StrOutputParser()
+    repair_chain = repair_prompt | json_llm | StrOutputParser()
+
+    def extract_tasks(notes: str) -> dict:
+        response = generate_tasks_chain.invoke({"meeting_notes": notes})
+        try:
+            tasks = parse_tasks(response)
+        except ValueError as e:
+            print(f"Task output was malformed, repairing: {e}")
+            repaired = repair_chain.invoke({"output": response, "error": str(e)})
+            try:
+                tasks = parse_tasks(repaired)
+            except ValueError as e:
+                tasks = salvage_tasks(repaired)
+                if not tasks.tasks:
+                    tasks = salvage_tasks(response)
+                print(f"Error: repaired task output is still invalid, keeping {len(tasks.tasks)} valid task(s): {e}")
+        return group_tasks(tasks)
+
+    return extract_tasks
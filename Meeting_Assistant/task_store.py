@@ -0,0 +1,199 @@
+# task_store.py
+import argparse
+import csv
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+
+from task_extraction import MeetingTask, task_key
+
+DEFAULT_DB = "tasks.db"
+EXPORT_COLUMNS = ["meeting_id", "created_at", "updated_at", "title", "assignee", "status", "due_date", "dedupe_key"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    assignee TEXT,
+    status TEXT NOT NULL,
+    due_date TEXT,
+    dedupe_key TEXT NOT NULL,
+    UNIQUE (meeting_id, dedupe_key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_dedupe_key ON tasks (dedupe_key, updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+"""
+
+UPSERT = """
+INSERT INTO tasks (meeting_id, created_at, updated_at, title, assignee, status, due_date, dedupe_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (meeting_id, dedupe_key) DO UPDATE SET
+    updated_at = excluded.updated_at,
+    status = excluded.status,
+    assignee = COALESCE(excluded.assignee, tasks.assignee),
+    due_date = COALESCE(excluded.due_date, tasks.due_date)
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class TaskStore:
+    def __init__(self, db_path=DEFAULT_DB):
+        """
+        Local SQLite store for the tasks extracted from every meeting.
+
+        A task is stored once per meeting (keyed by its normalised title), so
+        re-processing a recording updates rows instead of appending duplicates.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps the store usable from sink threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add_tasks(self, meeting_id: str, tasks: dict) -> int:
+        """
+        Insert or update the tasks of one meeting.
+
+        Args:
+            meeting_id (str): Identifier of the meeting (e.g. the recording name).
+            tasks (dict): Tasks grouped by status, as returned by generate_tasks.
+
+        Returns:
+            int: Number of rows inserted or updated; repeats of a task within
+            `tasks` are merged first, the way the upsert would merge them.
+        """
+        now = _now()
+        rows = {}
+        for task_list in tasks.values():
+            for task in task_list:
+                key = task_key(task)
+                previous = rows.get(key)
+                assignee, due_date = task.assignee, task.due_date
+                if previous:
+                    assignee = assignee if assignee is not None else previous[4]
+                    due_date = due_date if due_date is not None else previous[6]
+                title = previous[3] if previous else task.title
+                rows[key] = (meeting_id, now, now, title, assignee, task.status, due_date, key)
+        with closing(self._connect()) as conn, conn:
+            before = conn.total_changes
+            conn.executemany(UPSERT, rows.values())
+            return conn.total_changes - before
+
+    def tasks_for_meeting(self, meeting_id: str) -> list:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT * FROM tasks WHERE meeting_id = ? ORDER BY id", (meeting_id,)
+            ).fetchall()
+
+    def tasks_by_status(self, status: str, latest_only=True) -> list:
+        """
+        Tasks with the given status.
+
+        With latest_only, a task mentioned in several meetings only counts with
+        the status it had in the most recent one.
+        """
+        with closing(self._connect()) as conn:
+            if not latest_only:
+                return conn.execute(
+                    "SELECT * FROM tasks WHERE status = ? ORDER BY updated_at", (status,)
+                ).fetchall()
+            return conn.execute(
+                """
+                SELECT * FROM tasks AS t
+                WHERE t.status = ?
+                  AND t.updated_at = (SELECT MAX(updated_at) FROM tasks WHERE dedupe_key = t.dedupe_key)
+                ORDER BY t.updated_at
+                """,
+                (status,),
+            ).fetchall()
+
+    def count_by_status(self) -> dict:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def export_csv(self, csv_file: str, meeting_id=None) -> int:
+        """Write the stored tasks (optionally of a single meeting) to a CSV file."""
+        query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM tasks"
+        params = ()
+        if meeting_id:
+            query += " WHERE meeting_id = ?"
+            params = (meeting_id,)
+        count = 0
+        with closing(self._connect()) as conn, open(csv_file, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_COLUMNS)
+            # Rows are streamed from the cursor, the table is never loaded in memory at once
+            for row in conn.execute(query + " ORDER BY id", params):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def import_csv(self, csv_file: str, meeting_id="legacy") -> int:
+        """
+        Import an old `Task, Category` CSV such as new_tasks.csv; duplicates are dropped.
+
+        Rows that are not valid tasks (e.g. an unknown category) are reported
+        and skipped.
+        """
+        tasks = {}
+        with open(csv_file, newline="") as file:
+            # Line 1 is the header
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                try:
+                    task = MeetingTask(title=row.get("Task"), status=row.get("Category"))
+                except ValidationError as e:
+                    errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                    print(f"Skipping line {line} of {csv_file}: {errors}")
+                    continue
+                tasks.setdefault(task.status, []).append(task)
+        return self.add_tasks(meeting_id, tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and export the meeting task store.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Path to the SQLite database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export tasks to CSV.")
+    export.add_argument("csv_file")
+    export.add_argument("--meeting", help="Only export the tasks of this meeting.")
+
+    import_ = commands.add_parser("import-csv", help="Import a legacy Task,Category CSV.")
+    import_.add_argument("csv_file")
+    import_.add_argument("--meeting", default="legacy")
+
+    commands.add_parser("stats", help="Show the number of tasks per status.")
+
+    args = parser.parse_args()
+    store = TaskStore(args.db)
+    if args.command == "export":
+        count = store.export_csv(args.csv_file, args.meeting)
+        print(f"Exported {count} tasks to {args.csv_file}")
+    elif args.command == "import-csv":
+        count = store.import_csv(args.csv_file, args.meeting)
+        print(f"Imported {count} rows from {args.csv_file}")
+    else:
+        for status, count in store.count_by_status().items():
+            print(f"{status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# trello_sync.py
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from trello.exceptions import ResourceUnavailable
+
+from task_extraction import task_key
+
+# Marker appended to the card description so existing cards can be recognised
+KEY_MARKER = "task-key:"
+KEY_PATTERN = re.compile(re.escape(KEY_MARKER) + r"\s*([0-9a-f]+)")
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all worker threads.
+
+    Trello allows 100 requests per 10 seconds per token, so the default stays
+    a little below that.
+    """
+
+    def __init__(self, rate=90, per=10.0):
+        self.rate = rate
+        self.per = per
+        self.allowance = float(rate)
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.allowance = min(self.rate, self.allowance + (now - self.last_check) * self.rate / self.per)
+                self.last_check = now
+                if self.allowance >= 1:
+                    self.allowance -= 1
+                    return
+                wait = (1 - self.allowance) * self.per / self.rate
+            time.sleep(wait)
+
+
+def card_description(task):
+    details = []
+    if task.assignee:
+        details.append(f"Assignee: {task.assignee}")
+    if task.due_date:
+        details.append(f"Due: {task.due_date}")
+    details.append(f"{KEY_MARKER} {task_key(task)}")
+    return "\n".join(details)
+
+
+class TrelloSync:
+    def __init__(self, client, board_id, list_ids, max_workers=5,
+                 index_file=".trello_index.json", rate_limiter=None, max_retries=3):
+        """
+        Sync extracted tasks to a Trello board.
+
+        Args:
+            client (TrelloClient): Authenticated Trello client.
+            board_id (str): Id of the board holding the lists.
+            list_ids (dict): Maps a task status ("To-Do", "Doing", "Done") to a list id.
+            max_workers (int): Number of cards created concurrently.
+            index_file (str): Local index of already created cards (key -> card id).
+            rate_limiter (RateLimiter): Shared limiter, one per Trello token.
+            max_retries (int): Retries for a card request when Trello answers 429.
+        """
+        self.client = client
+        self.board_id = board_id
+        self.list_ids = list_ids
+        self.max_workers = max_workers
+        self.index_file = index_file
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self._board = None
+        self._lists = {}
+        self._index = self._load_index()
+        # Open cards seen by the last refresh and the list each one is in (key -> card / list id)
+        self._cards = {}
+        self._card_lists = {}
+        # Keys whose card is being created -> Future of the card, shared with concurrent syncs
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self):
+        if self.index_file and os.path.isfile(self.index_file):
+            with open(self.index_file) as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self):
+        if not self.index_file:
+            return
+        with self._lock:
+            # Written to a temporary file first so a crash never leaves a truncated index
+            tmp_path = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._index, f, indent=2)
+            os.replace(tmp_path, self.index_file)
+
+    @property
+    def board(self):
+        if self._board is None:
+            self.rate_limiter.acquire()
+            self._board = self.client.get_board(self.board_id)
+        return self._board
+
+    def get_list(self, status):
+        # Board lists are looked up once and reused for every card and every sync
+        if status not in self._lists:
+            self.rate_limiter.acquire()
+            self._lists[status] = self.board.get_list(self.list_ids[status])
+        return self._lists[status]
+
+    def refresh_index(self):
+        """
+        Rebuild the index from the board's open cards, found by their description marker.
+
+        Picks up cards created elsewhere (e.g. another machine) and drops the
+        entries of cards that were deleted or archived, so their tasks get a
+        card again.
+        """
+        with self._lock:
+            before = dict(self._index)
+        self.rate_limiter.acquire()
+        cards = self.board.open_cards()
+        index, found, card_lists = {}, {}, {}
+        for card in cards:
+            match = KEY_PATTERN.search(card.description or "")
+            if match and match.group(1) not in index:
+                key = match.group(1)
+                index[key] = card.id
+                found[key] = card
+                card_lists[key] = card.list_id
+        with self._lock:
+            # Keep the cards a concurrent sync created while the board was being read
+            for key, card_id in self._index.items():
+                if before.get(key) != card_id:
+                    index.setdefault(key, card_id)
+            self._index = index
+            self._cards = found
+            self._card_lists = card_lists
+
+    def _request(self, call):
+        """Run a Trello request through the rate limiter, retrying when Trello answers 429."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                return call()
+            except ResourceUnavailable as e:
+                if getattr(e, "_status", None) != 429 or attempt == self.max_retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _add_card(self, task):
+        trello_list = self.get_list(task.status)
+        return self._request(lambda: trello_list.add_card(name=task.title, desc=card_description(task)))
+
+    def _move_card(self, card, status):
+        self._request(lambda: card.change_list(self.list_ids[status]))
+
+    def sync(self, tasks: dict, refresh=True) -> dict:
+        """
+        Create a card for every task not already on the board.
+
+        A task whose card is in the list of another status is moved to the
+        list of its current status; this needs the card's list, so only
+        happens when the index was refreshed.
+
+        Args:
+            tasks (dict): Tasks grouped by status, as returned by generate_tasks.
+            refresh (bool): Read the board's open cards before syncing.
+
+        Returns:
+            dict: Number of cards "created", "moved", "skipped" and "failed".
+            A task another sync is creating at the same time is waited for: it
+            is "skipped" once that card exists and "failed" if its creation fails.
+        """
+        if refresh:
+            self.refresh_index()
+
+        # Resolve the lists up front so worker threads never race on the lookups
+        for status, task_list in tasks.items():
+            if task_list:
+                self.get_list(status)
+
+        pending, waiting, moves = {}, {}, {}
+        skipped = 0
+        with self._lock:
+            for status, task_list in tasks.items():
+                for task in task_list:
+                    key = task_key(task)
+                    if key in self._index:
+                        if key in self._cards and self._card_lists.get(key) != self.list_ids[status]:
+                            moves[key] = task
+                        else:
+                            skipped += 1
+                    elif key in self._in_flight:
+                        # Being created by a concurrent sync (another meeting) or earlier in this batch
+                        waiting[key] = (task, self._in_flight[key])
+                    else:
+                        pending[key] = task
+                        self._in_flight[key] = Future()
+
+        created, moved, failed = 0, 0, 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            move_futures = {executor.submit(self._move_card, self._cards[key], task.status): key
+                            for key, task in moves.items()}
+            futures = {executor.submit(self._add_card, task): key for key, task in pending.items()}
+            for future in as_completed(move_futures):
+                key = move_futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed to move card '{moves[key].title}' to {moves[key].status}: {e}")
+                    continue
+                with self._lock:
+                    self._card_lists[key] = self.list_ids[moves[key].status]
+                moved += 1
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    card = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed to add card '{pending[key].title}': {e}")
+                    with self._lock:
+                        shared = self._in_flight.pop(key)
+                    shared.set_exception(e)
+                    continue
+                with self._lock:
+                    self._index[key] = card.id
+                    self._cards[key] = card
+                    self._card_lists[key] = self.list_ids[pending[key].status]
+                    shared = self._in_flight.pop(key)
+                shared.set_result(card)
+                created += 1
+
+        for key, (task, shared) in waiting.items():
+            try:
+                shared.result()
+                skipped += 1
+            except Exception as e:
+                failed += 1
+                print(f"Failed to add card '{task.title}' (created by a concurrent sync): {e}")
+
+        self._save_index()
+        return {"created": created, "moved": moved, "skipped": skipped, "failed": failed}
@@ -7,66 +7,11 @@ load_dotenv()
 # Load the LLaMA model
 llama_model = ChatGroq(temperature = 0.3, groq_api_key=os.getenv("GROQ_API_KEY"))
 
-from transformers import AutoTokenizer, AutoModelForCausalLM
 from langchain.prompts import PromptTemplate
-import torch
-from torch.quantization import quantize_dynamic
-import time
-
-# 1. Load Tokenizer
-model_name = "mbien/recipenlg"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-tokenizer.pad_token = tokenizer.eos_token
-
-# 2. Load and Quantize Model
-print("Loading and quantizing model...")
-model = AutoModelForCausalLM.from_pretrained(model_name)
-
-# model = quantize_dynamic(
-#     model,
-#     {torch.nn.Linear},  # Target layers for quantization
-#     dtype=torch.qint8  # Use 16-bit floats for weights
-# )
-
-device = "cuda" if torch.cuda.is_available() else "cpu"
-model.to(device)
-
-print("Model quantization completed.")
-
-# 3. LangChain Prompt Template for Structured Output
-template_nlg = """
-You are an expert recipe generator. Generate the sensible recipe for the following:
-{query}
-"""
-
-prompt_nlg = PromptTemplate(template=template_nlg, input_variables=["query"])
-
-# 4. Optimized Generation Function
-def generate_recipe(query, max_length=400):
-    structured_prompt = prompt_nlg.format(query=query)
-    input_ids = tokenizer.encode(structured_prompt, return_tensors="pt").to(device)
-    
-    # Timing for performance analysis
-    start_time = time.time()
-    
-    attention_mask = torch.ones(input_ids.shape, device=device)
-    outputs = model.generate(
-        input_ids,
-        attention_mask=attention_mask,
-        max_length=max_length,
-        temperature=0.4,
-        top_k=10,
-        top_p=0.8,
-        do_sample=True,
-        num_return_sequences=1,
-        repetition_penalty=1.5
-    )
-    
-    end_time = time.time()
-    print(f"Time taken for generation: {end_time - start_time:.2f} seconds")
-    
-    generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    return generated_text
+import argparse
+import recipe_model
+from recipe_model import INFERENCE_MODES, generate_recipe, stream_recipe
+from recipe_cache import DraftCache, RecipeStore
 
 # 5. Beautify Output
 from textwrap import fill
@@ -77,16 +22,6 @@ def print_beautifully(text):
     print(formatted_text)
     print("\n" + "="*40 + " FINAL RECIPE " + "="*40 + "\n")
 
-# 6. Generate and Display Recipe
-query = input("Give the name of a dish to get the recipe of:")
-if "recipe" or "Recipe" not in query:
-    query = "Recipe of " + query
-structured_prompt = prompt_nlg.format(query=query)
-
-generated_recipe = generate_recipe(query)
-
-# print_beautifully(generated_recipe)
-
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 from langchain.output_parsers import StructuredOutputParser
 
@@ -118,6 +53,80 @@ parser = StrOutputParser()
 # Define the chain with Llama model and the prompt template
 chain = prompt_llama | llama_model | parser
 
-recipe_string = chain.invoke({"recipe": generated_recipe, "query": query})
-
-print(recipe_string)
\ No newline at end of file
+def build_query(query):
+    if "recipe" not in query.lower():
+        query = "Recipe of " + query
+    return query
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate a recipe for a dish.")
+    arg_parser.add_argument("--model", default=None,
+                            help="Hub id or exported local directory (see model_artifacts.py) of the RecipeNLG model.")
+    arg_parser.add_argument("--mode", choices=INFERENCE_MODES, default="fp32",
+                            help="Inference mode of the local RecipeNLG model.")
+    arg_parser.add_argument("--threads", type=int, default=None,
+                            help="Number of CPU threads used by torch.")
+    arg_parser.add_argument("--self-check", action="store_true",
+                            help="Report memory footprint and tokens/sec for every inference mode and exit.")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="Print the draft recipe while it is being generated.")
+    arg_parser.add_argument("--pipelined", action="store_true",
+                            help="Start the Llama refinement while the local draft is still being generated.")
+    arg_parser.add_argument("--draft-cache", default="draft_cache.json",
+                            help="Drafts reused by --pipelined for dishes generated before.")
+    arg_parser.add_argument("--recipe-db", default="recipes.db",
+                            help="Cache of refined recipes, looked up before generating anything.")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Always generate a fresh recipe.")
+    args = arg_parser.parse_args()
+
+    if args.self_check:
+        recipe_model.self_check(model_name=args.model, num_threads=args.threads)
+        return
+
+    # 6. Generate and Display Recipe
+    query = build_query(input("Give the name of a dish to get the recipe of:"))
+
+    # Popular dishes are served straight from the cache, without loading the model
+    recipe_store = None if args.no_cache else RecipeStore(args.recipe_db)
+    cached_recipe = recipe_store.get(query) if recipe_store else None
+    if cached_recipe:
+        print(cached_recipe)
+        return
+
+    draft_cache = DraftCache(args.draft_cache) if args.pipelined else None
+    if draft_cache is None or draft_cache.get(query) is None:
+        recipe_model.init_model(args.model, mode=args.mode, num_threads=args.threads)
+
+    if args.pipelined:
+        from recipe_pipeline import pipelined_recipe
+
+        recipe_string = ""
+        for chunk in pipelined_recipe(query, chain, draft_cache):
+            print(chunk, end="", flush=True)
+            recipe_string += chunk
+        print()
+        if recipe_store:
+            recipe_store.put(query, recipe_string)
+        return
+
+    if args.stream:
+        print("\n" + "="*40 + " DRAFT RECIPE " + "="*40 + "\n")
+        generated_recipe = ""
+        for text in stream_recipe(query):
+            print(text, end="", flush=True)
+            generated_recipe += text
+        print("\n" + "="*40 + " FINAL RECIPE " + "="*40 + "\n")
+    else:
+        generated_recipe = generate_recipe(query)
+
+    # print_beautifully(generated_recipe)
+
+    recipe_string = chain.invoke({"recipe": generated_recipe, "query": query})
+
+    print(recipe_string)
+    if recipe_store:
+        recipe_store.put(query, recipe_string)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import recipe_model
+
+
+class RecipeBatcher:
+    def __init__(self, max_batch_size=8, max_wait_ms=10):
+        """
+        Micro-batching scheduler for recipe generation.
+
+        Queries submitted from many threads are collected for up to
+        `max_wait_ms` (or until `max_batch_size` are queued) and generated
+        together in one batched generate() call.
+
+        Args:
+            max_batch_size (int): Largest number of queries per batch.
+            max_wait_ms (float): How long the first query of a batch waits for company.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="recipe-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, query, max_new_tokens=recipe_model.MAX_NEW_TOKENS) -> Future:
+        future = Future()
+        self._queue.put((query, max_new_tokens, future))
+        return future
+
+    def generate(self, query, max_new_tokens=recipe_model.MAX_NEW_TOKENS):
+        """Blocking helper: queue the query and wait for its recipe."""
+        return self.submit(query, max_new_tokens).result()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            # Requests asking for a different max_new_tokens are generated in their own group
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for max_new_tokens, items in groups.items():
+                items = [item for item in items if item[2].set_running_or_notify_cancel()]
+                if not items:
+                    continue
+                try:
+                    recipes = recipe_model.generate_recipes([item[0] for item in items], max_new_tokens)
+                except Exception as e:
+                    for item in items:
+                        item[2].set_exception(e)
+                    continue
+                for item, recipe in zip(items, recipes):
+                    item[2].set_result(recipe)
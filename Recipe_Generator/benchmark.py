@@ -0,0 +1,272 @@
+"""
+Recipe generation benchmark.
+
+Runs a fixed query set under every inference configuration (mode x thread
+count x batch size) and records model load time, time-to-first-token,
+tokens/sec and peak RSS. Each (mode, threads) configuration runs in its own
+process so load time and memory are measured from a clean start.
+
+The timed code is the app's own generate_recipe()/generate_recipes(), so the
+numbers include the recipe-end stopping criteria, the cached prompt prefix
+(batch size 1) and left-padded batching. Recipes stop at their end marker,
+so tokens/sec counts the token ids actually generated. --baseline adds rows for
+a bare model.generate() with a fixed output length for comparison.
+
+    python benchmark.py --modes fp32 int8 --threads 1 4 --batch-sizes 1 4 16
+    python benchmark.py --tiny          # random-weight GPT-2, no download needed
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import statistics
+import tempfile
+import time
+
+QUERIES = [
+    "Recipe of pasta carbonara",
+    "Recipe of chicken tikka masala",
+    "Recipe of pancakes",
+    "Recipe of guacamole",
+    "Recipe of beef stew",
+    "Recipe of margherita pizza",
+    "Recipe of palak paneer",
+    "Recipe of banana bread",
+    "Recipe of caesar salad",
+    "Recipe of tomato soup",
+    "Recipe of pad thai",
+    "Recipe of chocolate chip cookies",
+    "Recipe of vegetable biryani",
+    "Recipe of french onion soup",
+    "Recipe of lemon garlic shrimp",
+    "Recipe of apple pie",
+]
+
+RESULT_FIELDS = [
+    "model", "path", "mode", "threads", "batch_size", "max_new_tokens", "new_tokens", "load_seconds",
+    "ttft_seconds", "tokens_per_second", "seconds_per_batch", "peak_rss_mb",
+]
+
+
+def build_tiny_model(path):
+    """Save a tiny random-weight GPT-2 and a tokenizer trained on the query set to `path`."""
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+    from recipe_model import template_nlg
+
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(QUERIES + [template_nlg], vocab_size=512, special_tokens=["<|endoftext|>"])
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=bpe, eos_token="<|endoftext|>", unk_token="<|endoftext|>")
+    tokenizer.save_pretrained(path)
+
+    config = GPT2Config(vocab_size=len(tokenizer), n_positions=512, n_embd=128, n_layer=2, n_head=2,
+                        bos_token_id=tokenizer.eos_token_id, eos_token_id=tokenizer.eos_token_id)
+    GPT2LMHeadModel(config).save_pretrained(path)
+    return path
+
+
+class FirstTokenTimer:
+    """Streamer that only records when the first generated token arrives."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self._prompt_seen = False
+
+    def put(self, value):
+        # generate() sends the prompt first, then one step of new tokens at a time
+        if not self._prompt_seen:
+            self._prompt_seen = True
+        elif self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def end(self):
+        pass
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_to_first_text(query):
+    """Seconds until stream_recipe() yields its first text, then stop the generation."""
+    import threading
+    import recipe_model
+
+    stop_event = threading.Event()
+    start = time.perf_counter()
+    first_text_at = None
+    for _ in recipe_model.stream_recipe(query, stop_event=stop_event):
+        if first_text_at is None:
+            first_text_at = time.perf_counter()
+            stop_event.set()
+    return (first_text_at or time.perf_counter()) - start
+
+
+def _app_results(batch_size, max_new_tokens, repeats):
+    """Time generate_recipe()/generate_recipes() as the app calls them."""
+    import torch
+    import recipe_model
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(batch_size)]
+    ttfts, durations, new_tokens = [], [], []
+    for repeat in range(repeats):
+        # Same samples in every configuration
+        torch.manual_seed(repeat)
+        start = time.perf_counter()
+        if batch_size == 1:
+            _, length = recipe_model.generate_recipe(queries[0], max_new_tokens, return_lengths=True)
+            lengths = [length]
+        else:
+            _, lengths = recipe_model.generate_recipes(queries, max_new_tokens, return_lengths=True)
+        durations.append(time.perf_counter() - start)
+        new_tokens.append(sum(lengths))
+        ttfts.append(_time_to_first_text(queries[0]))
+
+    seconds = statistics.median(durations)
+    return {
+        "path": "generate_recipes",
+        "new_tokens": round(statistics.median(new_tokens)),
+        "ttft_seconds": round(statistics.median(ttfts), 4),
+        "tokens_per_second": round(sum(new_tokens) / sum(durations), 2),
+        "seconds_per_batch": round(seconds, 3),
+    }
+
+
+def _baseline_results(model, tokenizer, batch_size, max_new_tokens, repeats):
+    """Time a bare model.generate() with a fixed output length and greedy decoding."""
+    import torch
+    import recipe_model
+
+    tokenizer.padding_side = "left"
+    prompts = [recipe_model.prompt_nlg.format(query=QUERIES[i % len(QUERIES)]) for i in range(batch_size)]
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(model.device)
+    generate_kwargs = dict(max_new_tokens=max_new_tokens, min_new_tokens=max_new_tokens,
+                           do_sample=False, pad_token_id=tokenizer.eos_token_id)
+    ttfts, durations, new_tokens = [], [], []
+    with torch.inference_mode():
+        model.generate(**inputs, **dict(generate_kwargs, max_new_tokens=2, min_new_tokens=2))  # warm-up
+        for _ in range(repeats):
+            timer = FirstTokenTimer()
+            outputs = model.generate(**inputs, streamer=timer, **generate_kwargs)
+            durations.append(time.perf_counter() - timer.start)
+            ttfts.append(timer.first_token_at - timer.start)
+            # min_new_tokens keeps every row generating, so each id after the prompt is a generated one
+            new_tokens.append(batch_size * (outputs.shape[1] - inputs["input_ids"].shape[1]))
+
+    seconds = statistics.median(durations)
+    return {
+        "path": "model.generate",
+        "new_tokens": round(statistics.median(new_tokens)),
+        "ttft_seconds": round(statistics.median(ttfts), 4),
+        "tokens_per_second": round(sum(new_tokens) / sum(durations), 2),
+        "seconds_per_batch": round(seconds, 3),
+    }
+
+
+def _run_config(model_name, mode, threads, batch_sizes, max_new_tokens, repeats, baseline, results):
+    import torch
+    import recipe_model
+
+    start = time.perf_counter()
+    model, tokenizer = recipe_model.init_model(model_name, mode, threads)
+    load_seconds = time.perf_counter() - start
+    # Warm-up, which also builds the cached prompt prefix
+    recipe_model.generate_recipes(QUERIES[:2], 2)
+    recipe_model.generate_recipe(QUERIES[0], 2)
+
+    for batch_size in batch_sizes:
+        measurements = [_app_results(batch_size, max_new_tokens, repeats)]
+        if baseline:
+            measurements.append(_baseline_results(model, tokenizer, batch_size, max_new_tokens, repeats))
+        for measurement in measurements:
+            results.put({
+                "model": model_name,
+                "mode": mode,
+                "threads": torch.get_num_threads(),
+                "batch_size": batch_size,
+                "max_new_tokens": max_new_tokens,
+                "load_seconds": round(load_seconds, 3),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+                **measurement,
+            })
+
+
+def run_benchmark(model_name, modes, thread_counts, batch_sizes, max_new_tokens=64, repeats=3, baseline=False):
+    """
+    Benchmark every configuration, each (mode, threads) pair in a fresh process.
+
+    Returns:
+        list: One result dict per (mode, threads, batch size), two with baseline.
+    """
+    from recipe_model import bf16_supported
+
+    context = multiprocessing.get_context("spawn")
+    all_results = []
+    for mode in modes:
+        if mode == "bf16" and not bf16_supported():
+            print("Skipping bf16: not supported on this machine.")
+            continue
+        for threads in thread_counts:
+            print(f"Benchmarking mode={mode} threads={threads} batch sizes={batch_sizes}...")
+            results = context.Queue()
+            process = context.Process(target=_run_config,
+                                      args=(model_name, mode, threads, batch_sizes, max_new_tokens, repeats, baseline,
+                                            results))
+            process.start()
+            config_results = []
+            expected = len(batch_sizes) * (2 if baseline else 1)
+            while len(config_results) < expected:
+                try:
+                    config_results.append(results.get(timeout=1))
+                except queue.Empty:
+                    if not process.is_alive():
+                        break
+            process.join()
+            if process.exitcode != 0:
+                print(f"  failed with exit code {process.exitcode}")
+            for result in config_results:
+                print(f"  {result['path']:<16} batch={result['batch_size']:>2} ttft={result['ttft_seconds']:.3f}s "
+                      f"tok/s={result['tokens_per_second']:.1f} peak_rss={result['peak_rss_mb']:.0f}MB")
+            all_results.extend(config_results)
+    return all_results
+
+
+def write_results(results, output_prefix):
+    with open(output_prefix + ".json", "w") as f:
+        json.dump(results, f, indent=2)
+    with open(output_prefix + ".csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Results written to {output_prefix}.json and {output_prefix}.csv")
+
+
+def main():
+    from recipe_model import INFERENCE_MODES, default_model_path
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark recipe generation.")
+    arg_parser.add_argument("--model", default=default_model_path(), help="Hub id or local directory of the model.")
+    arg_parser.add_argument("--tiny", action="store_true", help="Use a tiny random-weight GPT-2 instead (offline).")
+    arg_parser.add_argument("--modes", nargs="+", choices=INFERENCE_MODES, default=["fp32", "int8"])
+    arg_parser.add_argument("--threads", nargs="+", type=int, default=[os.cpu_count()])
+    arg_parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 2, 4, 8, 16])
+    arg_parser.add_argument("--max-new-tokens", type=int, default=64)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    arg_parser.add_argument("--baseline", action="store_true",
+                            help="Also time a bare model.generate() with a fixed output length.")
+    arg_parser.add_argument("--output", default="benchmark_results", help="Output path without extension.")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tiny_dir:
+        model_name = build_tiny_model(tiny_dir) if args.tiny else args.model
+        results = run_benchmark(model_name, args.modes, args.threads, args.batch_sizes,
+                                args.max_new_tokens, args.repeats, args.baseline)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
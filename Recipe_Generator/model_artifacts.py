@@ -0,0 +1,112 @@
+"""
+Local, memory-mappable model artifacts.
+
+    python model_artifacts.py --out recipenlg-local --dtype bf16
+
+exports the model and tokenizer once; recipe_model.load_model() then loads
+from that directory offline, with the weights memory-mapped straight from the
+safetensors file so several worker processes share the same pages.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+
+import torch
+from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+from transformers.modeling_utils import no_init_weights
+
+DEFAULT_EXPORT_DIR = "recipenlg-local"
+EXPORT_DTYPES = {"fp32": torch.float32, "bf16": torch.bfloat16}
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+
+def export_model(model_name, out_dir=DEFAULT_EXPORT_DIR, dtype="fp32"):
+    """
+    Save the model as safetensors and the tokenizer to a local directory.
+
+    Args:
+        model_name (str): Hub id (or directory) of the source model.
+        out_dir (str): Target directory.
+        dtype (str): "fp32" or "bf16". Dynamic int8 weights cannot be stored
+            as safetensors, so int8 is applied at load time on top of fp32.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=EXPORT_DTYPES[dtype])
+    # A single unsharded file keeps loading to one mmap
+    model.save_pretrained(out_dir, safe_serialization=True, max_shard_size="100GB")
+    tokenizer.save_pretrained(out_dir)
+    print(f"Exported {model_name} ({dtype}) to {out_dir}")
+    return out_dir
+
+
+def is_local_artifact(path):
+    return os.path.isfile(os.path.join(path, "model.safetensors"))
+
+
+def mmap_safetensors(path):
+    """
+    Map a safetensors file and return its tensors without copying them.
+
+    The mapping is private copy-on-write: pages are shared with the page cache
+    (and with every other process mapping the file) until something writes to them.
+    """
+    with open(path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if end == begin:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        count = (end - begin) // torch.tensor([], dtype=dtype).element_size()
+        tensors[name] = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin).reshape(info["shape"])
+    return tensors
+
+
+def load_mmap_model(path):
+    """Build the model from a local artifact directory with memory-mapped weights."""
+    config = AutoConfig.from_pretrained(path, local_files_only=True)
+    state_dict = mmap_safetensors(os.path.join(path, "model.safetensors"))
+    dtype = next(iter(state_dict.values())).dtype
+
+    # Skip random initialisation, every weight is replaced by its mapped tensor
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config, torch_dtype=dtype)
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+    # Tied weights (GPT-2's lm_head) are not stored separately in the file
+    tied = set(getattr(model, "_tied_weights_keys", None) or [])
+    missing = [name for name in missing if name not in tied]
+    if missing or unexpected:
+        raise ValueError(f"Artifact in {path} does not match the model: missing={missing} unexpected={unexpected}")
+    return model
+
+
+def main():
+    from recipe_model import MODEL_NAME
+
+    arg_parser = argparse.ArgumentParser(description="Export the recipe model to local safetensors.")
+    arg_parser.add_argument("--model", default=MODEL_NAME)
+    arg_parser.add_argument("--out", default=DEFAULT_EXPORT_DIR)
+    arg_parser.add_argument("--dtype", choices=EXPORT_DTYPES, default="fp32",
+                            help="Export bf16 to load bf16 mode without converting (and halve the file).")
+    args = arg_parser.parse_args()
+    export_model(args.model, args.out, args.dtype)
+
+
+if __name__ == "__main__":
+    main()
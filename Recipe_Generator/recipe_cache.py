@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from difflib import SequenceMatcher
+
+# Trigrams of a query used to find fuzzy candidates; each one is an SQL parameter
+MAX_QUERY_TRIGRAMS = 200
+# How alike two words must be to count as the same word spelled differently
+MIN_WORD_SIMILARITY = 0.85
+
+# Leading words that do not change which dish is being asked for
+_QUERY_PREFIX = re.compile(r"^(?:(?:give|get|show)(?: me)? )?(?:(?:the|a) )?(?:recipes? (?:of|for) |recipes? )?")
+
+
+def normalize_dish_name(query):
+    """
+    Reduce a query to the dish it asks for, e.g. "Recipe of Pasta Carbonara!" -> "pasta carbonara".
+    """
+    name = re.sub(r"[^\w\s]", " ", query.lower())
+    name = " ".join(name.split())
+    name = _QUERY_PREFIX.sub("", name)
+    return re.sub(r" recipes?$", "", name).strip()
+
+
+class DraftCache:
+    def __init__(self, path=None):
+        """
+        Local RecipeNLG drafts keyed by normalized dish name.
+
+        Args:
+            path (str): Optional JSON file the cache is loaded from and saved to.
+        """
+        self.path = path
+        self._drafts = {}
+        self._lock = threading.Lock()
+        if path and os.path.isfile(path):
+            with open(path) as f:
+                self._drafts = json.load(f)
+
+    def get(self, query):
+        with self._lock:
+            return self._drafts.get(normalize_dish_name(query))
+
+    def put(self, query, draft):
+        with self._lock:
+            self._drafts[normalize_dish_name(query)] = draft
+            if self.path:
+                with open(self.path, "w") as f:
+                    json.dump(self._drafts, f)
+
+
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def same_words(name, other):
+    """
+    Whether two dish names have the same words, allowing small misspellings.
+
+    Every word of one name must pair up with a distinct, near-identical word
+    of the other, so "vegan chocolate cake" is not "chocolate cake" and
+    "chicken curry soup" is not "chicken curry rice".
+    """
+    words, other_words = name.split(), other.split()
+    if len(words) != len(other_words):
+        return False
+    for word in words:
+        best = max(other_words, key=lambda candidate: SequenceMatcher(None, word, candidate).ratio())
+        if SequenceMatcher(None, word, best).ratio() < MIN_WORD_SIMILARITY:
+            return False
+        other_words.remove(best)
+    return True
+
+
+class RecipeStore:
+    def __init__(self, db_path="recipes.db", ttl_seconds=7 * 24 * 3600, min_similarity=0.6):
+        """
+        Refined recipes keyed by normalized dish name, with expiry and fuzzy lookup.
+
+        Lookups first try the exact dish name, then near-identical names
+        ("spaghetti carbonara" / "spagetti carbonara") through a trigram index.
+        A fuzzy hit must have the same words as the query up to misspellings,
+        so a recipe is never served for a different dish.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+            ttl_seconds (int): How long a stored recipe stays valid.
+            min_similarity (float): Trigram Jaccard similarity needed for a fuzzy hit.
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS recipes (
+                    dish TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    recipe TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    n_trigrams INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS trigrams (
+                    trigram TEXT NOT NULL,
+                    dish TEXT NOT NULL,
+                    PRIMARY KEY (trigram, dish)
+                ) WITHOUT ROWID;
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, query):
+        """Return the cached recipe for the query's dish (or a near-identical one), or None."""
+        dish = normalize_dish_name(query)
+        oldest = time.time() - self.ttl_seconds
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT recipe FROM recipes WHERE dish = ? AND created_at >= ?", (dish, oldest)
+            ).fetchone()
+            if row:
+                return row[0]
+
+            grams = trigrams(dish)
+            # Candidates are found with a bounded sample; similarity uses every trigram below
+            lookup_grams = sorted(grams)[:MAX_QUERY_TRIGRAMS]
+            placeholders = ",".join("?" * len(lookup_grams))
+            candidates = conn.execute(
+                f"""
+                SELECT r.dish, r.recipe, COUNT(*) AS shared
+                FROM trigrams AS t JOIN recipes AS r ON r.dish = t.dish
+                WHERE t.trigram IN ({placeholders}) AND r.created_at >= ?
+                GROUP BY r.dish
+                ORDER BY shared DESC
+                LIMIT 20
+                """,
+                (*lookup_grams, oldest),
+            ).fetchall()
+
+        best, best_score = None, self.min_similarity
+        for candidate, recipe, _ in candidates:
+            candidate_grams = trigrams(candidate)
+            score = len(grams & candidate_grams) / len(grams | candidate_grams)
+            if score >= best_score and same_words(dish, candidate):
+                best, best_score = recipe, score
+        return best
+
+    def put(self, query, recipe):
+        dish = normalize_dish_name(query)
+        grams = trigrams(dish)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO recipes (dish, query, recipe, created_at, n_trigrams) VALUES (?, ?, ?, ?, ?)",
+                (dish, query, recipe, time.time(), len(grams)),
+            )
+            conn.execute("DELETE FROM trigrams WHERE dish = ?", (dish,))
+            conn.executemany("INSERT INTO trigrams (trigram, dish) VALUES (?, ?)", [(g, dish) for g in grams])
+
+    def purge_expired(self):
+        """Delete expired recipes and their index entries."""
+        oldest = time.time() - self.ttl_seconds
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM trigrams WHERE dish IN (SELECT dish FROM recipes WHERE created_at < ?)", (oldest,))
+            deleted = conn.execute("DELETE FROM recipes WHERE created_at < ?", (oldest,)).rowcount
+        return deleted
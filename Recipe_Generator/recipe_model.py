@@ -0,0 +1,389 @@
+import copy
+import gc
+import io
+import os
+import time
+from threading import Thread
+
+import torch
+from torch.quantization import quantize_dynamic
+from transformers import (AutoTokenizer, AutoModelForCausalLM, StoppingCriteria,
+                          StoppingCriteriaList, TextIteratorStreamer)
+from langchain.prompts import PromptTemplate
+
+from model_artifacts import DEFAULT_EXPORT_DIR, is_local_artifact, load_mmap_model
+
+MODEL_NAME = "mbien/recipenlg"
+# Exported with model_artifacts.py; used instead of the hub model when present
+LOCAL_MODEL_DIR = os.getenv("RECIPE_MODEL_DIR", DEFAULT_EXPORT_DIR)
+INFERENCE_MODES = ("fp32", "int8", "bf16")
+
+# RecipeNLG marks the end of a recipe (and of its instructions section) with these tokens
+RECIPE_END_MARKERS = ("<RECIPE_END>", "<INSTR_END>")
+
+# LangChain Prompt Template for Structured Output
+template_nlg = """
+You are an expert recipe generator. Generate the sensible recipe for the following:
+{query}
+"""
+
+prompt_nlg = PromptTemplate(template=template_nlg, input_variables=["query"])
+
+# Constant part of the prompt in front of the query, encoded once per model
+PROMPT_PREFIX, PROMPT_SUFFIX = template_nlg.split("{query}")
+
+# Loaded by init_model()
+tokenizer = None
+model = None
+_prefix_cache = None
+
+
+def set_num_threads(num_threads):
+    """Limit the CPU threads used by torch (intra-op) for this process."""
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def bf16_supported():
+    """Whether bf16 inference is natively supported on this machine."""
+    if torch.cuda.is_available():
+        return torch.cuda.is_bf16_supported()
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def default_model_path():
+    return LOCAL_MODEL_DIR if is_local_artifact(LOCAL_MODEL_DIR) else MODEL_NAME
+
+
+def load_model(model_name=None, mode="fp32", num_threads=None):
+    """
+    Load the tokenizer and the model in the given inference mode.
+
+    Local artifact directories (see model_artifacts.py) are loaded offline
+    with memory-mapped weights; anything else goes through the hub.
+
+    Args:
+        model_name (str): Hub id or local directory of the model, defaults to
+            the exported local copy when there is one.
+        mode (str): "fp32", "int8" (dynamic quantization of the Linear layers,
+            CPU only) or "bf16".
+        num_threads (int): CPU threads used by torch, defaults to torch's choice.
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}', expected one of {INFERENCE_MODES}")
+    set_num_threads(num_threads)
+    model_name = model_name or default_model_path()
+    local = is_local_artifact(model_name)
+
+    # 1. Load Tokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=local)
+    tokenizer.pad_token = tokenizer.eos_token
+
+    # 2. Load and Quantize Model
+    print(f"Loading {model_name} in {mode} mode...")
+    device = "cuda" if torch.cuda.is_available() and mode != "int8" else "cpu"
+    if mode == "bf16" and not bf16_supported():
+        print("Warning: bf16 is not natively supported here, inference may be slow.")
+    dtype = torch.bfloat16 if mode == "bf16" else torch.float32
+    if local:
+        model = load_mmap_model(model_name)
+        if model.dtype != dtype:
+            # Converting copies the weights out of the mapping; export in the serving dtype to avoid it
+            model = model.to(dtype)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=dtype)
+
+    if mode == "int8":
+        # Dynamic quantization only runs on CPU
+        model = quantize_dynamic(
+            model,
+            {torch.nn.Linear},  # Target layers for quantization
+            dtype=torch.qint8  # 8-bit integer weights, activations quantized on the fly
+        )
+
+    model.to(device)
+    model.eval()
+    print("Model loading completed.")
+    return model, tokenizer
+
+
+def init_model(model_name=None, mode="fp32", num_threads=None):
+    """Load the model used by generate_recipe()."""
+    global model, tokenizer, _prefix_cache
+    model, tokenizer = load_model(model_name, mode, num_threads)
+    _prefix_cache = None
+    return model, tokenizer
+
+
+def prompt_prefix_cache():
+    """
+    Token ids and past key/values of PROMPT_PREFIX for the loaded model.
+
+    Computed on first use and reused by every single-query generation, so only
+    the query part of the prompt goes through the prefill.
+    """
+    global _prefix_cache
+    if _prefix_cache is None:
+        prefix_ids = tokenizer(PROMPT_PREFIX, return_tensors="pt").input_ids.to(model.device)
+        with torch.inference_mode():
+            past_key_values = model(prefix_ids, use_cache=True).past_key_values
+        _prefix_cache = (prefix_ids, past_key_values)
+    return _prefix_cache
+
+
+def _single_prompt_inputs(query):
+    """generate() inputs for one query, starting from the cached prompt prefix."""
+    prefix_ids, past_key_values = prompt_prefix_cache()
+    # The prefix ends with a newline, so encoding both halves separately
+    # gives the same tokens as encoding the whole prompt
+    suffix_ids = tokenizer(query + PROMPT_SUFFIX, return_tensors="pt",
+                           add_special_tokens=False).input_ids.to(model.device)
+    input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+    return {
+        "input_ids": input_ids,
+        "attention_mask": torch.ones_like(input_ids),
+        # generate() extends the cache in place, so every request gets its own copy
+        "past_key_values": copy.deepcopy(past_key_values),
+    }
+
+
+# Sampling settings shared by every generation path
+GENERATION_KWARGS = dict(
+    temperature=0.4,
+    top_k=10,
+    top_p=0.8,
+    do_sample=True,
+    num_return_sequences=1,
+    repetition_penalty=1.5,
+)
+
+
+class RecipeEndCriteria(StoppingCriteria):
+    """Stop each sequence as soon as it emits a recipe-end marker (or EOS)."""
+
+    def __init__(self, stop_ids):
+        self.stop_ids = torch.tensor(sorted(stop_ids))
+
+    def __call__(self, input_ids, scores, **kwargs):
+        # Per-row result: finished rows are padded while the others keep going
+        return torch.isin(input_ids[:, -1], self.stop_ids.to(input_ids.device))
+
+
+class EventStoppingCriteria(StoppingCriteria):
+    """Stop generation from another thread by setting a threading.Event."""
+
+    def __init__(self, stop_event):
+        self.stop_event = stop_event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.stop_event.is_set()
+
+
+def recipe_end_token_ids(tokenizer):
+    """Ids of the recipe-end markers known to the tokenizer, plus EOS."""
+    stop_ids = {tokenizer.eos_token_id}
+    for marker in RECIPE_END_MARKERS:
+        token_id = tokenizer.convert_tokens_to_ids(marker)
+        if token_id is not None and token_id != tokenizer.unk_token_id:
+            stop_ids.add(token_id)
+    return stop_ids
+
+
+def recipe_stopping_criteria(tokenizer):
+    return StoppingCriteriaList([RecipeEndCriteria(recipe_end_token_ids(tokenizer))])
+
+
+# New tokens per recipe; about what max_length=400 left after the prompt
+MAX_NEW_TOKENS = 370
+
+
+def generated_lengths(new_ids, stop_ids):
+    """
+    Number of tokens each row actually generated.
+
+    Rows that finish early are filled with the pad (EOS) token, so a row's
+    length runs up to and including its first stop token.
+    """
+    lengths = []
+    stop_ids = torch.tensor(sorted(stop_ids), device=new_ids.device)
+    for row in new_ids:
+        stops = torch.isin(row, stop_ids).nonzero()
+        lengths.append(int(stops[0]) + 1 if len(stops) else len(row))
+    return lengths
+
+
+# Optimized Generation Function
+def generate_recipe(query, max_new_tokens=MAX_NEW_TOKENS, return_lengths=False):
+    if return_lengths:
+        recipes, lengths = generate_recipes([query], max_new_tokens, return_lengths=True)
+        return recipes[0], lengths[0]
+    return generate_recipes([query], max_new_tokens)[0]
+
+
+def generate_recipes(queries, max_new_tokens=MAX_NEW_TOKENS, return_lengths=False):
+    """
+    Generate recipes for several queries with a single generate() call.
+
+    The prompts are left-padded so every row ends at the same position and
+    generation continues from the real end of each prompt. A single query
+    reuses the cached prompt prefix instead. The limit counts new tokens
+    only, so padding does not shorten the recipes of short prompts in a
+    mixed batch.
+
+    Returns:
+        list: The generated text of each query, without the prompt (as
+        stream_recipe() yields it). With return_lengths, a tuple of that list
+        and the number of tokens generated for each query.
+    """
+    if len(queries) == 1:
+        inputs = _single_prompt_inputs(queries[0])
+    else:
+        structured_prompts = [prompt_nlg.format(query=query) for query in queries]
+        tokenizer.padding_side = "left"
+        inputs = tokenizer(structured_prompts, return_tensors="pt", padding=True).to(model.device)
+
+    # Timing for performance analysis
+    start_time = time.time()
+
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            pad_token_id=tokenizer.eos_token_id,
+            stopping_criteria=recipe_stopping_criteria(tokenizer),
+            **GENERATION_KWARGS
+        )
+
+    end_time = time.time()
+    print(f"Time taken for generation ({len(queries)} queries): {end_time - start_time:.2f} seconds")
+
+    # Every row of the output starts with the (padded) prompt
+    new_ids = outputs[:, inputs["input_ids"].shape[1]:]
+    recipes = tokenizer.batch_decode(new_ids, skip_special_tokens=True)
+    if return_lengths:
+        return recipes, generated_lengths(new_ids, recipe_end_token_ids(tokenizer))
+    return recipes
+
+
+def stream_recipe(query, max_new_tokens=MAX_NEW_TOKENS, stop_event=None, skip_special_tokens=True):
+    """
+    Generate a recipe for one query, yielding the text as it is produced.
+
+    Generation stops at the first recipe-end marker instead of running to
+    max_new_tokens, the same limit generate_recipes() uses. An error raised
+    by generate() is raised here once the text produced before it has been
+    yielded.
+
+    Args:
+        query (str): The recipe query.
+        max_new_tokens (int): Upper bound on the generated tokens.
+        stop_event (threading.Event): Setting it stops generation early.
+        skip_special_tokens (bool): Hide RecipeNLG section markers in the text.
+    """
+    inputs = _single_prompt_inputs(query)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=skip_special_tokens)
+    stopping_criteria = recipe_stopping_criteria(tokenizer)
+    if stop_event is not None:
+        stopping_criteria.append(EventStoppingCriteria(stop_event))
+
+    errors = []
+
+    def run_generation():
+        try:
+            with torch.inference_mode():
+                model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    pad_token_id=tokenizer.eos_token_id,
+                    stopping_criteria=stopping_criteria,
+                    streamer=streamer,
+                    **GENERATION_KWARGS
+                )
+        except Exception as e:
+            errors.append(e)
+            # generate() only ends the streamer when it finishes, the consumer would wait forever
+            streamer.end()
+
+    thread = Thread(target=run_generation, daemon=True)
+    thread.start()
+    yield from streamer
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def model_size_mb(model):
+    """Size of the serialized weights, which also counts quantized packed params."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 2**20
+
+
+def rss_mb():
+    """Current resident memory of this process."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def self_check(model_name=None, modes=INFERENCE_MODES, num_threads=None,
+               query="Recipe of pancakes", max_new_tokens=64):
+    """
+    Load the model in every mode and report memory footprint and tokens/sec.
+
+    Returns:
+        list: One dict per mode with the measurements.
+    """
+    results = []
+    for mode in modes:
+        if mode == "bf16" and not bf16_supported():
+            print("Skipping bf16: not supported on this machine.")
+            continue
+        gc.collect()
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        check_model, check_tokenizer = load_model(model_name, mode, num_threads)
+        load_seconds = time.perf_counter() - start
+
+        inputs = check_tokenizer(prompt_nlg.format(query=query), return_tensors="pt").to(check_model.device)
+        with torch.inference_mode():
+            start = time.perf_counter()
+            outputs = check_model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                min_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=check_tokenizer.eos_token_id
+            )
+            generate_seconds = time.perf_counter() - start
+        new_tokens = outputs.shape[1] - inputs["input_ids"].shape[1]
+
+        results.append({
+            "mode": mode,
+            "threads": torch.get_num_threads(),
+            "load_seconds": round(load_seconds, 2),
+            "model_mb": round(model_size_mb(check_model), 1),
+            "rss_delta_mb": round(rss_mb() - rss_before, 1),
+            "tokens_per_second": round(new_tokens / generate_seconds, 2),
+        })
+        del check_model, check_tokenizer
+
+    print(f"\n{'mode':<6}{'threads':>8}{'load s':>9}{'model MB':>10}{'RSS +MB':>9}{'tok/s':>8}")
+    for r in results:
+        print(f"{r['mode']:<6}{r['threads']:>8}{r['load_seconds']:>9}{r['model_mb']:>10}"
+              f"{r['rss_delta_mb']:>9}{r['tokens_per_second']:>8}")
+    return results
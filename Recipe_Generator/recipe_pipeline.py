@@ -0,0 +1,118 @@
+import queue
+import re
+import threading
+
+import recipe_model
+from recipe_model import MAX_NEW_TOKENS, stream_recipe
+
+# Once the ingredients are complete the refinement step has enough to work with
+SPECULATION_MARKER = "<INGR_END>"
+_MARKERS = re.compile(r"<[A-Z_]+>")
+
+_DONE = object()
+
+
+def clean_draft(draft):
+    """Replace the RecipeNLG section markers and the tokenizer's special tokens (e.g. EOS) with line breaks."""
+    draft = _MARKERS.sub("\n", draft)
+    if recipe_model.tokenizer is not None:
+        for token in recipe_model.tokenizer.all_special_tokens:
+            draft = draft.replace(token, "\n")
+    return re.sub(r"\n\s*\n", "\n", draft).strip()
+
+
+def _refine(chain, query, draft, output):
+    try:
+        for chunk in chain.stream({"recipe": draft, "query": query}):
+            output.put(chunk)
+    except Exception as e:
+        output.put(e)
+    finally:
+        output.put(_DONE)
+
+
+def _start_refinement(chain, query, draft, output):
+    threading.Thread(target=_refine, args=(chain, query, draft, output), daemon=True).start()
+
+
+def _draft_and_refine(query, chain, draft_cache, speculate, finish_draft, max_new_tokens, output):
+    stop_event = threading.Event()
+    started = False
+    draft = ""
+    try:
+        for text in stream_recipe(query, max_new_tokens, stop_event=stop_event, skip_special_tokens=False):
+            draft += text
+            if speculate and not started and SPECULATION_MARKER in draft:
+                print("Ingredients drafted, starting refinement...")
+                _start_refinement(chain, query, clean_draft(draft), output)
+                started = True
+                if not finish_draft or draft_cache is None:
+                    stop_event.set()
+    except Exception as e:
+        if not started:
+            output.put(e)
+            output.put(_DONE)
+        return
+
+    if not started:
+        _start_refinement(chain, query, clean_draft(draft), output)
+    if draft_cache is not None and not stop_event.is_set():
+        draft_cache.put(query, clean_draft(draft))
+
+
+def pipelined_recipe(query, chain, draft_cache=None, speculate=True, finish_draft=True,
+                     max_new_tokens=MAX_NEW_TOKENS, draft_timeout=60):
+    """
+    Generate a refined recipe, overlapping the local draft with the Llama refinement.
+
+    The local draft is streamed; as soon as its ingredients section is complete
+    the refinement chain is started on that partial draft. With finish_draft the
+    local model keeps going in the background so the full draft can be cached;
+    once the refined recipe is complete the generator waits up to
+    draft_timeout seconds for that draft before returning, so a short-lived
+    caller such as the CLI does not exit before the cache is written. When a
+    cached draft exists for the dish, the local stage is skipped entirely.
+
+    Args:
+        query (str): The recipe query.
+        chain: The refinement chain taking {"recipe", "query"}.
+        draft_cache (DraftCache): Drafts keyed by normalized dish name.
+        speculate (bool): Start refinement on the partial draft.
+        finish_draft (bool): Finish the local draft after speculation starts
+            (only done when there is a draft cache to fill).
+        max_new_tokens (int): Upper bound on the tokens of the local draft.
+        draft_timeout (float): Seconds to wait for the background draft after
+            the refinement is done, None to wait until it finishes.
+
+    Yields:
+        str: Chunks of the refined recipe, as soon as they arrive.
+    """
+    refined = queue.Queue()
+    cached = draft_cache.get(query) if draft_cache is not None else None
+    draft_thread = None
+
+    if cached is not None:
+        print("Using cached draft, skipping local generation.")
+        _start_refinement(chain, query, cached, refined)
+    else:
+        draft_thread = threading.Thread(
+            target=_draft_and_refine,
+            args=(query, chain, draft_cache, speculate, finish_draft, max_new_tokens, refined),
+            daemon=True
+        )
+        draft_thread.start()
+
+    while True:
+        chunk = refined.get()
+        if chunk is _DONE:
+            break
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+    # The draft thread is a daemon: without this the caller may exit before the draft is cached
+    if draft_thread is not None and draft_thread.is_alive():
+        print("\nFinishing the local draft for the cache...")
+        draft_thread.join(draft_timeout)
+        if draft_thread.is_alive():
+            print("Local draft not finished in time, it will not be cached.")
@@ -0,0 +1,129 @@
+"""
+Long-lived recipe server that keeps the RecipeNLG model and tokenizer loaded.
+
+    python recipe_server.py --port 8000 --mode int8
+
+    POST /draft   {"query": "pasta carbonara"}  -> local RecipeNLG draft only
+    POST /recipe  {"query": "pasta carbonara"}  -> draft refined by the Llama chain
+    GET  /health
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import recipe_model
+from batching import RecipeBatcher
+from recipe_cache import RecipeStore
+from recipe_model import INFERENCE_MODES
+from Recipe_Generator_Bot import build_query, chain
+
+# Created in main(); concurrent requests are generated together in batches
+batcher = None
+recipe_store = None
+
+
+def draft_recipe(query):
+    return batcher.generate(query)
+
+
+def refine_recipe(query, draft):
+    return chain.invoke({"recipe": draft, "query": query})
+
+
+class RecipeRequestHandler(BaseHTTPRequestHandler):
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_query(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("The request body must be a JSON object")
+        query = payload.get("query", "")
+        if not isinstance(query, str):
+            raise ValueError("'query' must be a string")
+        if not query.strip():
+            raise ValueError("Missing 'query'")
+        return build_query(query.strip())
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "model_loaded": recipe_model.model is not None})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path not in ("/draft", "/recipe"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            query = self._read_query()
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            if self.path == "/recipe" and recipe_store is not None:
+                cached_recipe = recipe_store.get(query)
+                if cached_recipe:
+                    self._send_json(200, {"query": query, "recipe": cached_recipe, "cached": True})
+                    return
+
+            start = time.perf_counter()
+            draft = draft_recipe(query)
+            response = {"query": query, "draft": draft, "draft_seconds": round(time.perf_counter() - start, 3)}
+            if self.path == "/recipe":
+                start = time.perf_counter()
+                response["recipe"] = refine_recipe(query, draft)
+                response["refine_seconds"] = round(time.perf_counter() - start, 3)
+                if recipe_store is not None:
+                    recipe_store.put(query, response["recipe"])
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, response)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve recipe generation over HTTP.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--model", default=None, help="Hub id or exported local model directory.")
+    arg_parser.add_argument("--mode", choices=INFERENCE_MODES, default="fp32")
+    arg_parser.add_argument("--threads", type=int, default=None)
+    arg_parser.add_argument("--max-batch-size", type=int, default=8)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=10)
+    arg_parser.add_argument("--recipe-db", default="recipes.db")
+    arg_parser.add_argument("--cache-ttl", type=int, default=7 * 24 * 3600,
+                            help="Seconds a refined recipe is served from the cache.")
+    arg_parser.add_argument("--no-cache", action="store_true")
+    args = arg_parser.parse_args()
+
+    # The model is loaded once and stays resident for every request
+    recipe_model.init_model(args.model, mode=args.mode, num_threads=args.threads)
+
+    global batcher, recipe_store
+    batcher = RecipeBatcher(args.max_batch_size, args.max_wait_ms)
+    if not args.no_cache:
+        recipe_store = RecipeStore(args.recipe_db, ttl_seconds=args.cache_ttl)
+        recipe_store.purge_expired()
+
+    server = ThreadingHTTPServer((args.host, args.port), RecipeRequestHandler)
+    print(f"Recipe server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Plan many trips at once.
+
+    python batch_planner.py trips.jsonl --output plans.jsonl --workers 4
+    python batch_planner.py trips.csv
+
+Every input row (JSON object or CSV row) needs origin, city, start_date,
+num_days and budget; an optional id is copied to the output. Each plan is
+appended to the output JSON Lines file as soon as it finishes, with its
+timing and token usage per agent and task.
+"""
+import argparse
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+REQUIRED_FIELDS = ("origin", "city", "start_date", "num_days", "budget")
+
+
+def read_trip_requests(path):
+    """
+    Read trip requests from a .csv file or a JSON Lines file.
+
+    Raises:
+        ValueError: When a line is not a JSON object or a request is missing
+            a required field.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            requests = list(csv.DictReader(f))
+        else:
+            requests = []
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Line {line_number} of {path} is not valid JSON: {e}") from e
+                if not isinstance(request, dict):
+                    raise ValueError(f"Line {line_number} of {path} is not a JSON object")
+                requests.append(request)
+
+    for number, request in enumerate(requests, start=1):
+        # 0 is a valid number of days or budget, only absent or blank fields are missing
+        missing = [field for field in REQUIRED_FIELDS
+                   if request.get(field) is None or str(request[field]).strip() == ""]
+        if missing:
+            raise ValueError(f"Trip request {number} in {path} is missing {', '.join(missing)}")
+        request.setdefault("id", str(number))
+    return requests
+
+
+class _ResultWriter:
+    """Appends one JSON line per finished plan."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def plan_trip(request, parallel=True):
+    # Imported here so the module (and its shared LLM client and tool caches)
+    # is loaded once, by whichever worker gets there first
+    from vacation_planning_agent import TripCrew
+
+    crew = TripCrew(request["origin"], request["city"], request["num_days"], request["budget"],
+                    request["start_date"], parallel=parallel, memory=False, verbose=False)
+    plan = str(crew.run())
+    return plan, crew.usage.report()
+
+
+def run_batch(requests, output_path="trip_plans.jsonl", workers=4, parallel=True):
+    """
+    Plan every trip request with a bounded pool of crews.
+
+    All crews share the module-level LLM client and the cached search and
+    scraping tools of vacation_planning_agent, so a city researched for one
+    customer is served from the cache for the next. Crew memory is turned off
+    because the crews would otherwise share (and contend for) one memory store.
+
+    Args:
+        requests (list): Trip request dicts from read_trip_requests().
+        output_path (str): JSON Lines file receiving one record per request.
+        workers (int): Crews running at the same time.
+        parallel (bool): Run each crew's research tasks concurrently too.
+
+    Returns:
+        list: The output records, in the order of `requests`.
+    """
+    import vacation_planning_agent  # noqa: F401  (load the shared clients before the workers start)
+
+    writer = _ResultWriter(output_path)
+
+    def process(request):
+        record = {"id": request["id"], "request": request, "status": "ok"}
+        start = time.perf_counter()
+        try:
+            record["plan"], record["tokens"] = plan_trip(request, parallel)
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["seconds"] = round(time.perf_counter() - start, 2)
+        writer.write(record)
+        return record
+
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(workers, thread_name_prefix="trip") as pool:
+        futures = {pool.submit(process, request): index for index, request in enumerate(requests)}
+        records = [None] * len(requests)
+        for future in as_completed(futures):
+            record = future.result()
+            records[futures[future]] = record
+            print(f"[{record['status']}] {record['id']}: {record['request']['city']} in {record['seconds']}s")
+
+    failed = sum(record["status"] != "ok" for record in records)
+    print(f"Planned {len(records) - failed}/{len(records)} trips in {time.perf_counter() - batch_start:.1f}s, "
+          f"results in {output_path}")
+    return records
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Plan many trips from a JSONL or CSV file.")
+    arg_parser.add_argument("input", help="JSON Lines or .csv file of trip requests.")
+    arg_parser.add_argument("--output", default="trip_plans.jsonl")
+    arg_parser.add_argument("--workers", type=int, default=4, help="Trips planned at the same time.")
+    arg_parser.add_argument("--sequential-tasks", action="store_true",
+                            help="Run each crew's research tasks one after the other.")
+    args = arg_parser.parse_args()
+
+    requests = read_trip_requests(args.input)
+    print(f"Planning {len(requests)} trips with {args.workers} workers...")
+    run_batch(requests, args.output, args.workers, parallel=not args.sequential_tasks)
+
+
+if __name__ == "__main__":
+    main()
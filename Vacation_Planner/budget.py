@@ -0,0 +1,144 @@
+import json
+import math
+import os
+from collections import defaultdict
+from typing import List, Optional, Type
+
+from crewai_tools import BaseTool
+from pydantic import BaseModel, Field
+
+# Units of INR per unit of currency. Approximate; override with TRIP_RATES_FILE
+# (a JSON object in the same shape) to use current rates.
+DEFAULT_RATES = {
+    "INR": 1.0,
+    "USD": 83.0,
+    "EUR": 90.0,
+    "GBP": 105.0,
+    "AED": 22.6,
+    "SGD": 61.5,
+    "THB": 2.3,
+    "JPY": 0.55,
+    "AUD": 54.5,
+}
+CURRENCY_ALIASES = {"RS": "INR", "RS.": "INR", "₹": "INR", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+
+
+def load_rates(path=None):
+    """
+    Return the rate table, from the JSON file at path (or TRIP_RATES_FILE) if there is one.
+
+    Raises:
+        ValueError: When a rate in the file is not a positive number.
+    """
+    path = path or os.getenv("TRIP_RATES_FILE")
+    rates = dict(DEFAULT_RATES)
+    if path and os.path.isfile(path):
+        with open(path) as f:
+            for code, rate in json.load(f).items():
+                rate = float(rate)
+                # A zero rate would divide by zero when converting into that currency
+                if not (math.isfinite(rate) and rate > 0):
+                    raise ValueError(f"rate for '{code}' in {path} must be a positive number, got {rate}")
+                rates[code.upper()] = rate
+    return rates
+
+
+def currency_code(currency):
+    code = str(currency).strip().upper()
+    return CURRENCY_ALIASES.get(code, code)
+
+
+class BudgetItem(BaseModel):
+    day: int = Field(..., description="Trip day the cost falls on, starting at 1 (0 for trip-wide costs like flights)")
+    category: str = Field(..., description="e.g. flights, accommodation, food, activities, transport")
+    unit_cost: float = Field(..., description="Cost of one unit")
+    quantity: float = Field(1, description="Number of units (nights, people, tickets, ...)")
+    currency: str = Field("INR", description="Currency of unit_cost, e.g. INR, USD, EUR")
+    description: str = Field("", description="Optional short label")
+
+
+def compute_budget(items, target_currency="INR", budget=None, rates=None):
+    """
+    Total a list of line items per day and per category in one currency.
+
+    Args:
+        items (list): BudgetItem objects or dicts with the same fields.
+        target_currency (str): Currency of every total.
+        budget (float): Optional trip budget in the target currency.
+        rates (dict): Currency -> units of INR, defaults to load_rates().
+
+    Returns:
+        dict: "currency", "per_day", "per_category", "total" and, with a
+        budget, "remaining".
+
+    Raises:
+        ValueError: On an unknown currency or a negative amount.
+    """
+    rates = rates or load_rates()
+    target = currency_code(target_currency)
+    if target not in rates:
+        raise ValueError(f"unknown currency '{target_currency}', known: {', '.join(sorted(rates))}")
+
+    per_day = defaultdict(float)
+    per_category = defaultdict(float)
+    for item in items:
+        if isinstance(item, dict):
+            item = BudgetItem(**item)
+        source = currency_code(item.currency)
+        if source not in rates:
+            raise ValueError(f"unknown currency '{item.currency}' for {item.category} on day {item.day}, "
+                             f"known: {', '.join(sorted(rates))}")
+        if item.unit_cost < 0 or item.quantity < 0:
+            raise ValueError(f"negative amount for {item.category} on day {item.day}")
+        amount = item.unit_cost * item.quantity * rates[source] / rates[target]
+        per_day[item.day] += amount
+        per_category[item.category.strip().lower()] += amount
+
+    total = sum(per_day.values())
+    result = {
+        "currency": target,
+        "per_day": {day: round(per_day[day], 2) for day in sorted(per_day)},
+        "per_category": {category: round(amount, 2) for category, amount in
+                         sorted(per_category.items(), key=lambda pair: pair[1], reverse=True)},
+        "total": round(total, 2),
+    }
+    if budget is not None:
+        result["remaining"] = round(budget - total, 2)
+    return result
+
+
+def format_budget(result):
+    currency = result["currency"]
+    lines = ["Per day:"]
+    for day, amount in result["per_day"].items():
+        label = "Trip-wide" if day == 0 else f"Day {day}"
+        lines.append(f"- {label}: {currency} {amount:,.2f}")
+    lines.append("Per category:")
+    for category, amount in result["per_category"].items():
+        lines.append(f"- {category}: {currency} {amount:,.2f}")
+    lines.append(f"Total: {currency} {result['total']:,.2f}")
+    if "remaining" in result:
+        status = "under" if result["remaining"] >= 0 else "over"
+        lines.append(f"Remaining: {currency} {result['remaining']:,.2f} ({status} budget)")
+    return "\n".join(lines)
+
+
+class BudgetToolSchema(BaseModel):
+    items: List[BudgetItem] = Field(..., description="Every cost line item of the trip")
+    target_currency: str = Field("INR", description="Currency to report totals in")
+    budget: Optional[float] = Field(None, description="Total trip budget in target_currency, if known")
+
+
+class BudgetTool(BaseTool):
+    name: str = "Compute trip budget"
+    description: str = ("Totals all cost line items of a trip in one call. Give every item with its day, "
+                        "category, unit_cost, quantity and currency; returns per-day and per-category "
+                        "totals converted to the target currency, plus what is left of the budget.")
+    args_schema: Type[BaseModel] = BudgetToolSchema
+
+    def _run(self, **kwargs):
+        try:
+            result = compute_budget(kwargs["items"], kwargs.get("target_currency", "INR"), kwargs.get("budget"))
+        except (ValueError, TypeError) as e:
+            return f"Error: {e}"
+        return format_budget(result)
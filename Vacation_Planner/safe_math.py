@@ -0,0 +1,228 @@
+"""
+Safe arithmetic evaluation for the calculator tool.
+
+Expressions are parsed with ast and only numeric operations are evaluated,
+so nothing the LLM sends can run code. Besides plain arithmetic it accepts
+what travel budgets tend to look like:
+
+    Rs. 1,20,000 / 5           currency symbols/codes and thousands separators
+    18% of 4500                percentages
+    4500 + 18%                 adding/subtracting a percentage of the left side
+    sum([1200, 800, 450]) * 3  lists, elementwise +/-, sum/min/max/avg
+"""
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+
+MAX_EXPONENT = 100
+MAX_MAGNITUDE = 1e18
+MAX_LIST_LENGTH = 1000
+MAX_EXPRESSION_LENGTH = 10000
+# Longest part of the expression repeated back in an error message
+MAX_QUOTED_LENGTH = 80
+
+_CURRENCY = re.compile(r"(?:₹|\$|€|£|¥|\b(?:rs|inr|usd|eur|gbp|jpy)\b\.?)", re.IGNORECASE)
+_TIMES = re.compile(r"(?<=[\d)\]])\s*[x×]\s*(?=[\d(\[])")
+# A % that ends an operand is a percentage; one followed by an operand is modulo
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%(?!\s*[\d(\[])")
+_PERCENT_OF = re.compile(r"\)\s*of\b", re.IGNORECASE)
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _avg(values):
+    return sum(values) / len(values)
+
+
+_FUNCTIONS = {
+    "sum": sum, "min": min, "max": max, "avg": _avg, "mean": _avg,
+    "abs": abs, "round": round, "sqrt": math.sqrt, "ceil": math.ceil, "floor": math.floor,
+}
+_LIST_FUNCTIONS = {"sum", "min", "max", "avg", "mean"}
+# (fewest, most) arguments of the functions taking single numbers
+_ARITY = {"percent": (1, 1), "abs": (1, 1), "round": (1, 2), "sqrt": (1, 1), "ceil": (1, 1), "floor": (1, 1)}
+
+
+class CalculationError(ValueError):
+    pass
+
+
+def _strip_thousands_separators(expression):
+    """Drop commas between digits unless they separate list items or call arguments."""
+    result = []
+    stack = []
+    for i, char in enumerate(expression):
+        if char == "[":
+            stack.append("list")
+        elif char == "(":
+            before = expression[:i].rstrip()
+            stack.append("call" if before and (before[-1].isalpha() or before[-1] == "_") else "group")
+        elif char in ")]" and stack:
+            stack.pop()
+        elif char == "," and (not stack or stack[-1] == "group"):
+            if 0 < i < len(expression) - 1 and expression[i - 1].isdigit() and expression[i + 1].isdigit():
+                continue
+        result.append(char)
+    return "".join(result)
+
+
+def normalize_expression(expression):
+    """Rewrite the human notations above into plain Python arithmetic."""
+    expression = str(expression).strip().strip("`").strip()
+    expression = _CURRENCY.sub("", expression)
+    expression = _strip_thousands_separators(expression)
+    expression = expression.replace("÷", "/").replace("^", "**")
+    expression = _TIMES.sub("*", expression)
+    expression = _PERCENT.sub(r"percent(\1)", expression)
+    expression = _PERCENT_OF.sub(")*", expression)
+    return " ".join(expression.split())
+
+
+def _is_percent(node):
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "percent"
+
+
+def _check_number(value):
+    if isinstance(value, complex):
+        raise CalculationError("result is not a real number")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise CalculationError("result is not a finite number")
+    if isinstance(value, (int, float)) and abs(value) > MAX_MAGNITUDE:
+        raise CalculationError("result is too large")
+    return value
+
+
+def _elementwise(op, left, right):
+    left_list, right_list = isinstance(left, list), isinstance(right, list)
+    if not left_list and not right_list:
+        return _check_number(op(left, right))
+    if left_list and right_list:
+        if op not in (operator.add, operator.sub):
+            raise CalculationError("lists can only be added to or subtracted from each other")
+        if len(left) != len(right):
+            raise CalculationError(f"cannot combine lists of length {len(left)} and {len(right)}")
+        return [_check_number(op(a, b)) for a, b in zip(left, right)]
+    if left_list:
+        return [_check_number(op(a, right)) for a in left]
+    return [_check_number(op(left, b)) for b in right]
+
+
+def _eval(node):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalculationError(f"unsupported value {node.value!r}")
+        return _check_number(node.value)
+    if isinstance(node, (ast.List, ast.Tuple)):
+        if len(node.elts) > MAX_LIST_LENGTH:
+            raise CalculationError(f"lists are limited to {MAX_LIST_LENGTH} items")
+        values = [_eval(element) for element in node.elts]
+        if any(isinstance(value, list) for value in values):
+            raise CalculationError("nested lists are not supported")
+        return values
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        operand = _eval(node.operand)
+        op = _UNARY[type(node.op)]
+        return [op(value) for value in operand] if isinstance(operand, list) else op(operand)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        # "4500 + 18%" adds 18% of 4500
+        if isinstance(node.op, (ast.Add, ast.Sub)) and _is_percent(node.right):
+            left = _eval(node.left)
+            rate = _eval(node.right)
+            return _elementwise(operator.mul, left, 1 + rate if isinstance(node.op, ast.Add) else 1 - rate)
+        left, right = _eval(node.left), _eval(node.right)
+        if op is operator.pow:
+            if isinstance(right, list) or isinstance(left, list):
+                raise CalculationError("powers of lists are not supported")
+            if abs(right) > MAX_EXPONENT:
+                raise CalculationError(f"exponent {right} is too large (limit {MAX_EXPONENT})")
+        return _elementwise(op, left, right)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        name = node.func.id
+        if node.keywords:
+            raise CalculationError(f"{name}() does not take keyword arguments")
+        if name != "percent" and name not in _FUNCTIONS:
+            raise CalculationError(f"unknown function '{name}', available: {', '.join(sorted(_FUNCTIONS))}")
+        if name in _ARITY:
+            fewest, most = _ARITY[name]
+            if not fewest <= len(node.args) <= most:
+                expected = fewest if fewest == most else f"{fewest} to {most}"
+                raise CalculationError(f"{name}() takes {expected} argument(s), got {len(node.args)}")
+        args = [_eval(arg) for arg in node.args]
+        if name == "percent":
+            return _elementwise(operator.truediv, args[0], 100)
+        if name in _LIST_FUNCTIONS:
+            values = args[0] if len(args) == 1 and isinstance(args[0], list) else args
+            if not values or any(isinstance(value, list) for value in values):
+                raise CalculationError(f"{name}() needs a list of numbers or several numbers")
+            return _check_number(_FUNCTIONS[name](values))
+        if any(isinstance(arg, list) for arg in args):
+            return [_check_number(_FUNCTIONS[name](value, *args[1:])) for value in args[0]]
+        return _check_number(_FUNCTIONS[name](*args))
+    if isinstance(node, ast.Name):
+        raise CalculationError(f"unknown name '{node.id}', only numbers and {', '.join(sorted(_FUNCTIONS))} are allowed")
+    raise CalculationError(f"unsupported syntax '{type(node).__name__}'")
+
+
+def _format(value):
+    if isinstance(value, list):
+        return "[" + ", ".join(_format(item) for item in value) + "]"
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return str(round(value, 4))
+    return str(value)
+
+
+def _quote(expression):
+    if len(expression) > MAX_QUOTED_LENGTH:
+        expression = expression[:MAX_QUOTED_LENGTH - 3] + "..."
+    return f"'{expression}'"
+
+
+@lru_cache(maxsize=1024)
+def _evaluate_normalized(expression):
+    # Parsing is inside the handler too: a long flat sum is deeply nested for ast
+    try:
+        return _format(_eval(ast.parse(expression, mode="eval")))
+    except SyntaxError as e:
+        position = f" at position {e.offset}" if e.offset else ""
+        return f"Error: invalid syntax{position} in {_quote(expression)}"
+    except ZeroDivisionError:
+        return f"Error: division by zero in {_quote(expression)}"
+    except (RecursionError, MemoryError):
+        return "Error: expression is too long or too deeply nested, split it into smaller steps"
+    except CalculationError as e:
+        return f"Error: {e} in {_quote(expression)}"
+    except (TypeError, ValueError, IndexError, OverflowError) as e:
+        return f"Error: {e} in {_quote(expression)}"
+
+
+def evaluate(expression):
+    """
+    Evaluate an arithmetic expression without executing code.
+
+    Args:
+        expression (str): The expression, e.g. "Rs. 4500 * 3 + 18%".
+
+    Returns:
+        str: The result, or a message starting with "Error:" that says what to fix.
+    """
+    if not str(expression).strip():
+        return "Error: empty expression"
+    if len(str(expression)) > MAX_EXPRESSION_LENGTH:
+        return f"Error: expression is longer than {MAX_EXPRESSION_LENGTH} characters, split it into smaller steps"
+    return _evaluate_normalized(normalize_expression(expression))
@@ -0,0 +1,198 @@
+import threading
+from collections import defaultdict
+from typing import Any, Optional
+
+from crewai_tools import BaseTool
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Token caps per agent: tool_tokens caps every tool result the agent reads,
+# output_tokens caps the task output handed to later tasks as context
+DEFAULT_BUDGETS = {
+    "city_selection_agent": {"tool_tokens": 1500, "output_tokens": 1000},
+    "local_expert": {"tool_tokens": 1500, "output_tokens": 1000},
+    "travel_concierge": {"tool_tokens": 1000, "output_tokens": None},
+}
+
+_encodings = {}
+
+
+def _encoding(model):
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("cl100k_base")
+    return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4"):
+    """Count tokens with tiktoken, or estimate them (~4 characters each) without it."""
+    text = str(text or "")
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text, max_tokens, model="gpt-4"):
+    """
+    Shorten text to about max_tokens, keeping whole paragraphs from the start.
+
+    Returns:
+        str: The text unchanged if it fits, otherwise the leading paragraphs
+        that fit plus a note saying how much was left out.
+    """
+    text = str(text or "")
+    total = count_tokens(text, model)
+    if max_tokens is None or total <= max_tokens:
+        return text
+
+    kept, used = [], 0
+    for paragraph in text.split("\n"):
+        size = count_tokens(paragraph, model) + 1
+        if used + size > max_tokens:
+            if not kept:
+                # A single huge paragraph: cut it by characters instead
+                kept.append(paragraph[:max_tokens * 4])
+            break
+        kept.append(paragraph)
+        used += size
+    kept_text = "\n".join(kept).rstrip()
+    omitted = total - count_tokens(kept_text, model)
+    return kept_text + f"\n[... truncated, {omitted} of {total} tokens omitted]"
+
+
+class TokenUsage:
+    """Thread-safe token counters per agent and per task."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.agents = defaultdict(lambda: defaultdict(int))
+        self.tasks = defaultdict(lambda: defaultdict(int))
+
+    def add_agent(self, agent, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.agents[agent][name] += value
+
+    def add_task(self, task, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.tasks[task][name] += value
+
+    def report(self):
+        with self._lock:
+            return {
+                "agents": {agent: dict(counts) for agent, counts in self.agents.items()},
+                "tasks": {task: dict(counts) for task, counts in self.tasks.items()},
+            }
+
+    def print_report(self):
+        report = self.report()
+        print("Token usage per agent:")
+        for agent, counts in report["agents"].items():
+            print(f"- {agent}: {counts.get('prompt_tokens', 0)} in, {counts.get('completion_tokens', 0)} out, "
+                  f"{counts.get('llm_calls', 0)} calls, tool output {counts.get('tool_tokens_kept', 0)}"
+                  f"/{counts.get('tool_tokens', 0)} tokens kept")
+        print("Token usage per task:")
+        for task, counts in report["tasks"].items():
+            print(f"- {task}: {counts.get('prompt_tokens', 0)} in, {counts.get('completion_tokens', 0)} out, "
+                  f"{counts.get('llm_calls', 0)} calls, output {counts.get('output_tokens_kept', 0)}"
+                  f"/{counts.get('output_tokens', 0)} tokens kept")
+
+
+class TokenCounter(BaseCallbackHandler):
+    """
+    LLM callback that adds every call's prompt and completion tokens to one agent's counters.
+
+    When the agent works on a single task, the calls are added to that task's
+    counters as well.
+    """
+
+    def __init__(self, usage, agent, model="gpt-4", task=None):
+        self.usage = usage
+        self.agent = agent
+        self.model = model
+        self.task = task
+        self._prompt_estimates = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._prompt_estimates[run_id] = sum(
+            count_tokens(message.content, self.model) for batch in messages for message in batch
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._prompt_estimates[run_id] = sum(count_tokens(prompt, self.model) for prompt in prompts)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        estimate = self._prompt_estimates.pop(run_id, 0)
+        # Prefer the provider's own numbers when it reports them
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens", estimate)
+        completion_tokens = token_usage.get("completion_tokens")
+        if completion_tokens is None:
+            completion_tokens = sum(
+                count_tokens(generation.text, self.model) for batch in response.generations for generation in batch
+            )
+        self.usage.add_agent(self.agent, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, llm_calls=1)
+        if self.task:
+            self.usage.add_task(self.task, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, llm_calls=1)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._prompt_estimates.pop(run_id, None)
+
+
+def counted_llm(llm, usage, agent, task=None):
+    """Copy of llm that reports its token usage to `usage` under `agent` (and `task`); the HTTP client is shared."""
+    model = getattr(llm, "model_name", "gpt-4")
+    return llm.copy(update={"callbacks": [TokenCounter(usage, agent, model, task)]})
+
+
+class BudgetedTool(BaseTool):
+    """Wraps a tool so each result is cut to the agent's token cap before the LLM sees it."""
+
+    name: str = ""
+    description: str = ""
+    tool: Any = None
+    max_tokens: Optional[int] = None
+    usage: Any = None
+    agent: str = ""
+
+    def __init__(self, tool, max_tokens, usage, agent, **kwargs):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            max_tokens=max_tokens,
+            usage=usage,
+            agent=agent,
+            **kwargs
+        )
+
+    def _run(self, **kwargs):
+        result = str(self.tool._run(**kwargs))
+        kept = truncate_to_tokens(result, self.max_tokens)
+        self.usage.add_agent(self.agent, tool_tokens=count_tokens(result), tool_tokens_kept=count_tokens(kept))
+        return kept
+
+
+def compact_output_callback(usage, task_name, max_tokens):
+    """
+    Task callback that shortens the task output before later tasks receive it as context.
+
+    crewAI builds a task's context from the raw output of its context tasks,
+    so truncating it here bounds what the next agent's prompt carries over.
+    """
+    def compact(output):
+        # Older crewAI versions call the field raw_output
+        field = "raw" if hasattr(output, "raw") else "raw_output"
+        text = getattr(output, field)
+        kept = truncate_to_tokens(text, max_tokens)
+        setattr(output, field, kept)
+        usage.add_task(task_name, output_tokens=count_tokens(text), output_tokens_kept=count_tokens(kept))
+    return compact
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from crewai_tools import BaseTool
+
+# How long a cached result stays valid, by the kind of information it holds
+SOURCE_TTLS = {
+    "weather": 3 * 3600,
+    "events": 24 * 3600,
+    "page": 7 * 24 * 3600,
+    "attractions": 30 * 24 * 3600,
+}
+
+# Whole words only, so "train" or "Bahrain" is not weather and "prevent" is not an event
+_WEATHER_WORDS = re.compile(r"\b(?:weather|forecasts?|temperatures?|rain(?:y|fall)?|monsoons?|climate)\b")
+_EVENT_WORDS = re.compile(
+    r"\b(?:events?|festivals?|holidays?|concerts?|prices?|costs?|flights?|fares?|hotels?|bookings?)\b"
+)
+
+
+def classify_search(args):
+    """Pick the TTL source type of a search from its query text."""
+    text = " ".join(str(value) for value in args.values()).lower()
+    if _WEATHER_WORDS.search(text):
+        return "weather"
+    if _EVENT_WORDS.search(text):
+        return "events"
+    return "attractions"
+
+
+def classify_page(args):
+    """Pick the TTL source type of a scraped page from its URL."""
+    text = " ".join(str(value) for value in args.values()).lower()
+    if _WEATHER_WORDS.search(text):
+        return "weather"
+    if _EVENT_WORDS.search(text):
+        return "events"
+    return "page"
+
+
+def _digest(data):
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResearchCache:
+    def __init__(self, cache_dir=".research_cache", ttls=None):
+        """
+        Content-addressed on-disk store for tool results, shared by every agent.
+
+        A request key (sha256 of the tool name and its normalized arguments)
+        points to a blob named by the sha256 of the result, so identical
+        results for different requests are stored once. Concurrent calls
+        for the same key share a single in-flight call.
+
+        Args:
+            cache_dir (str): Directory holding the keys/ and blobs/ folders.
+            ttls (dict): Source type -> seconds, defaults to SOURCE_TTLS.
+        """
+        self.cache_dir = cache_dir
+        self.ttls = ttls or SOURCE_TTLS
+        self._keys_dir = os.path.join(cache_dir, "keys")
+        self._blobs_dir = os.path.join(cache_dir, "blobs")
+        os.makedirs(self._keys_dir, exist_ok=True)
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def request_key(tool_name, args):
+        return _digest(json.dumps({"tool": tool_name, "args": args}, sort_keys=True))
+
+    def _key_path(self, key):
+        return os.path.join(self._keys_dir, key[:2], key + ".json")
+
+    def _blob_path(self, blob):
+        return os.path.join(self._blobs_dir, blob[:2], blob)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key, source):
+        """Return the stored result for the key, or None if missing or expired."""
+        try:
+            with open(self._key_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created_at"] > self.ttls.get(source, 0):
+                return None
+            with open(self._blob_path(entry["blob"]), encoding="utf-8") as f:
+                return f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, source, result):
+        blob = _digest(result)
+        blob_path = self._blob_path(blob)
+        if not os.path.exists(blob_path):
+            self._write_atomic(blob_path, result)
+        entry = {"source": source, "blob": blob, "created_at": time.time()}
+        self._write_atomic(self._key_path(key), json.dumps(entry))
+
+    def get_or_call(self, key, source, call):
+        """
+        Return the cached result for the key, or compute it with call().
+
+        Only one call runs per key at a time; other callers asking for the same
+        key wait for its result instead of issuing their own request. Results
+        starting with "Error:" are returned but not stored.
+        """
+        cached = self.get(key, source)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = str(call())
+            if not result.startswith("Error:"):
+                self.put(key, source, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def purge_expired(self):
+        """Delete expired keys and the blobs no key points to anymore."""
+        now = time.time()
+        live_blobs = set()
+        for folder, _, files in os.walk(self._keys_dir):
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if now - entry["created_at"] > self.ttls.get(entry["source"], 0):
+                    os.remove(path)
+                else:
+                    live_blobs.add(entry["blob"])
+        for folder, _, files in os.walk(self._blobs_dir):
+            for name in files:
+                if name not in live_blobs:
+                    os.remove(os.path.join(folder, name))
+
+
+class CachedTool(BaseTool):
+    """Wraps a crewAI tool so its results go through a shared ResearchCache."""
+
+    name: str = ""
+    description: str = ""
+    tool: Any = None
+    cache: Any = None
+    classify: Any = None
+    ignore_case: bool = False
+
+    def __init__(self, tool, cache, classify, ignore_case=False, **kwargs):
+        """
+        Args:
+            tool (BaseTool): The tool to wrap, e.g. SerperDevTool().
+            cache (ResearchCache): Store shared by all wrapped tools.
+            classify (callable): Maps the call arguments to a SOURCE_TTLS key.
+            ignore_case (bool): Treat arguments differing only in case as the
+                same request (right for search queries, not for URLs).
+        """
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            cache=cache,
+            classify=classify,
+            ignore_case=ignore_case,
+            **kwargs
+        )
+
+    def _normalize(self, args):
+        normalized = {}
+        for name, value in args.items():
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                if self.ignore_case:
+                    value = value.lower()
+            normalized[name] = value
+        return normalized
+
+    def _run(self, **kwargs):
+        args = self._normalize(kwargs)
+        key = ResearchCache.request_key(self.tool.name, args)
+        return self.cache.get_or_call(key, self.classify(args), lambda: self.tool._run(**kwargs))
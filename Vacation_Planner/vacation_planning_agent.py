@@ -21,13 +21,21 @@ llama_model = ChatOpenAI(
 )
 
 from langchain.tools import tool
-from crewai_tools import SeleniumScrapingTool
 from crewai_tools import SerperDevTool
 
-search_tool = SerperDevTool(n_results=3)
-scraping_tool = SeleniumScrapingTool()
+from tool_cache import CachedTool, ResearchCache, classify_page, classify_search
+from web_scraper import WebPageTool
+
+# One cache shared by every agent, so repeated searches and pages are fetched once.
+# Pages are read over plain HTTP; the browser is only started for JavaScript-only pages.
+research_cache = ResearchCache(os.getenv("TRIP_CACHE_DIR", ".research_cache"))
+search_tool = CachedTool(SerperDevTool(n_results=3), research_cache, classify_search, ignore_case=True)
+scraping_tool = CachedTool(WebPageTool(), research_cache, classify_page)
 
 from langchain.tools import tool
+from safe_math import evaluate
+from budget import BudgetTool
+from token_budget import BudgetedTool, compact_output_callback, counted_llm, DEFAULT_BUDGETS, TokenUsage
 
 class CalculatorTools():
 
@@ -36,17 +44,46 @@ class CalculatorTools():
         """Useful to perform any mathematical calculations,
         like sumation, subtraction, multiplication, division, etc.
         The input to this tool should be a mathematical
-        expression, a couple examples are `200*7` or `5000/2*10`
+        expression, a couple examples are `200*7` or `5000/2*10`.
+        Percentages (`18% of 4500`, `4500 + 18%`), amounts like `Rs. 1,20,000`
+        and lists (`sum([1200, 800, 450]) * 3`) are also accepted.
         """
-        try:
-            return eval(operation)
-        except SyntaxError:
-            return "Error: Invalid syntax in mathematical expression"
+        return evaluate(operation)
 
 from crewai import Agent
 
+# Each agent works on one task, so its LLM calls are counted for that task too
+AGENT_TASKS = {
+    "city_selection_agent": "identify_task",
+    "local_expert": "gather_task",
+    "travel_concierge": "plan_task",
+}
+
 class TripAgents():
 
+    def __init__(self, budgets=None, usage=None, verbose=True):
+        """
+        Args:
+            budgets (dict): Agent method name -> {"tool_tokens": cap}; tool results
+                above the cap are truncated before the agent reads them.
+            usage (TokenUsage): Collects tokens in/out per agent and task when given.
+            verbose (bool): Print each agent's reasoning and tool calls.
+        """
+        self.budgets = budgets or {}
+        self.usage = usage
+        self.verbose = verbose
+
+    def _tools(self, agent_name, tools):
+        max_tokens = self.budgets.get(agent_name, {}).get("tool_tokens")
+        if self.usage is None or max_tokens is None:
+            return tools
+        return [BudgetedTool(tool, max_tokens, self.usage, agent_name) for tool in tools]
+
+    def _llm(self, agent_name):
+        if self.usage is None:
+            return llama_model
+        return counted_llm(llama_model, self.usage, agent_name, AGENT_TASKS.get(agent_name))
+
     def city_selection_agent(self):
         return Agent(
             role='Global Destination Strategist',
@@ -54,12 +91,12 @@ class TripAgents():
             backstory="""A travel strategist with extensive experience in curating city recommendations.
                          Uses real-time data on weather conditions, cultural events, and cost factors
                          to provide data-driven, personalized travel advice for an unforgettable experience.""",
-            tools=[
+            tools=self._tools("city_selection_agent", [
                 search_tool,
                 scraping_tool,
-            ],
-            verbose=True,
-            llm=llama_model,
+            ]),
+            verbose=self.verbose,
+            llm=self._llm("city_selection_agent"),
             allow_delegation=False,
             max_iter=2
         )
@@ -71,12 +108,12 @@ class TripAgents():
             backstory="""A passionate local specialist who has explored every corner of the city,
             offering unparalleled knowledge about its culture, cuisine, and unique attractions.
             Your expertise ensures visitors enjoy authentic experiences and uncover the city's true spirit.""",
-            tools=[
+            tools=self._tools("local_expert", [
                 search_tool,
                 scraping_tool,
-            ],
-            verbose=True,
-            llm=llama_model,
+            ]),
+            verbose=self.verbose,
+            llm=self._llm("local_expert"),
             allow_delegation=False,
             max_iter=2
         )
@@ -89,13 +126,15 @@ class TripAgents():
             backstory="""A highly-regarded travel planner trusted for blending luxury, efficiency,
             and practicality. With years of experience, you ensure stress-free travel planning
             tailored to each traveler's unique preferences and constraints.""",
-            tools=[
+            tools=self._tools("travel_concierge", [
                 search_tool,
                 scraping_tool,
+            ]) + [
                 CalculatorTools.calculate,
+                BudgetTool(),
             ],
-            verbose=True,
-            llm=llama_model,
+            verbose=self.verbose,
+            llm=self._llm("travel_concierge"),
             allow_delegation=False,
             max_iter=2
         )
@@ -105,7 +144,7 @@ from crewai import Task
 from textwrap import dedent
 
 class TripTasks:
-    def identify_task(self, agent, origin, city, budget, num_days, start_date):
+    def identify_task(self, agent, origin, city, budget, num_days, start_date, async_execution=False, callback=None):
         return Task(
             description=dedent(f"""
                 Collect and analyze essential information for the destination city - {city} for the upcoming trip:
@@ -127,10 +166,12 @@ class TripTasks:
                 Structure the response with clear headings for weather, events, costs, and attractions for easy readability.
             """),
             agent=agent,
+            async_execution=async_execution,
+            callback=callback,
             expected_output="Concise, well-organized report with headings for weather, costs, and key activities, staying within token limits."
         )
 
-    def gather_task(self, agent, origin, city, budget, num_days):
+    def gather_task(self, agent, origin, city, budget, num_days, async_execution=False, callback=None):
         return Task(
             description=dedent(f"""
                 Create an in-depth travel guide for {city}, focusing on:
@@ -149,10 +190,12 @@ class TripTasks:
                 The output should feel like a professional travel blog entry.
             """),
             agent=agent,
+            async_execution=async_execution,
+            callback=callback,
             expected_output="Comprehensive travel guide with clear sections for attractions, culture, and practical information."
         )
 
-    def plan_task(self, agent, origin, city, budget, num_days):
+    def plan_task(self, agent, origin, city, budget, num_days, context=None, callback=None):
         return Task(
             description=dedent(f"""
                 Develop a detailed travel itinerary for a {num_days}-day trip to {city}.
@@ -161,7 +204,9 @@ class TripTasks:
                 - Dining Options: Recommend places to eat each day.
                 - Accommodation: Include specific suggestions.
                 - Packing List: Tailored to weather conditions and planned activities.
-                - Budget Breakdown: Approximate costs per day. Try to be precise.
+                - Budget Breakdown: Costs per day and per category. List every cost as a line item
+                  (day, category, unit cost, quantity, currency) and total them all in a single call
+                  to the "Compute trip budget" tool instead of adding them up one calculation at a time.
 
                 **Details**:
                 - Starting Location: {origin}
@@ -171,6 +216,8 @@ class TripTasks:
                 Format the itinerary with clear day-by-day entries, making it easy to follow.
             """),
             agent=agent,
+            context=context,
+            callback=callback,
             expected_output="Detailed daily itinerary including activities, dining, accommodation, and costs."
         )
 
@@ -181,16 +228,25 @@ from crewai import Crew, Process
 
 class TripCrew:
 
-  def __init__(self, origin, city, num_days, budget, start_date):
+  def __init__(self, origin, city, num_days, budget, start_date, parallel=True, memory=True, verbose=True,
+               budgets=DEFAULT_BUDGETS):
     self.city = city
     self.origin = origin
     self.budget = budget
     self.num_days = num_days
     self.start_date = start_date
+    # Run the two independent research tasks at the same time
+    self.parallel = parallel
+    self.memory = memory
+    self.verbose = verbose
+    # Token caps per agent (see token_budget.DEFAULT_BUDGETS), None to disable
+    self.budgets = budgets
+    self.usage = TokenUsage()
 
   def run(self):
-    agents = TripAgents()
+    agents = TripAgents(self.budgets, self.usage, self.verbose)
     tasks = TripTasks()
+    budgets = self.budgets or {}
 
     city_selector_agent = agents.city_selection_agent()
     local_expert_agent = agents.local_expert()
@@ -202,21 +258,28 @@ class TripCrew:
       self.city,
       self.budget,
       self.num_days,
-      self.start_date
+      self.start_date,
+      async_execution=self.parallel,
+      callback=self._compact("identify_task", budgets.get("city_selection_agent"))
     )
     gather_task = tasks.gather_task(
       local_expert_agent,
       self.origin,
       self.city,
       self.budget,
-      self.num_days
+      self.num_days,
+      async_execution=self.parallel,
+      callback=self._compact("gather_task", budgets.get("local_expert"))
     )
+    # The itinerary waits for both research tasks and gets their outputs as context
     plan_task = tasks.plan_task(
       travel_concierge_agent,
       self.origin,
       self.city,
       self.budget,
-      self.num_days
+      self.num_days,
+      context=[identify_task, gather_task],
+      callback=self._compact("plan_task", budgets.get("travel_concierge"))
     )
 
     crew = Crew(
@@ -224,14 +287,20 @@ class TripCrew:
         city_selector_agent, local_expert_agent, travel_concierge_agent
       ],
       tasks=[identify_task, gather_task, plan_task],
-      Process=Process.sequential,
-      verbose=True,
-      memory=True
+      process=Process.sequential,
+      verbose=self.verbose,
+      memory=self.memory
     )
 
     result = crew.kickoff()
+    if self.verbose:
+      self.usage.print_report()
     return result
 
+  def _compact(self, task_name, budget):
+    max_tokens = (budget or {}).get("output_tokens")
+    return compact_output_callback(self.usage, task_name, max_tokens)
+
 if __name__ == "__main__":
   print("## Welcome to Trip Planner Crew")
   print('-------------------------------')
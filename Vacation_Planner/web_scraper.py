@@ -0,0 +1,189 @@
+import codecs
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Type
+
+import requests
+from crewai_tools import BaseTool
+from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+MAX_TEXT_CHARS = 8000
+# Pages with less visible text than this are checked for client-side rendering
+MIN_STATIC_CHARS = 500
+REQUEST_TIMEOUT = (5, 15)
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+_SKIPPED_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "head", "nav", "footer", "form"}
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "header", "li", "ul", "ol", "table", "tr",
+               "br", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "blockquote", "pre"}
+_JS_REQUIRED = re.compile(
+    r"enable javascript|javascript is (?:required|disabled)|requires javascript"
+    r"|<div id=\"(?:root|app|__next)\">\s*</div>",
+    re.IGNORECASE,
+)
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+
+class PageFetchError(Exception):
+    """Raised when a page cannot be read; never cached, so the next call tries again."""
+
+
+def build_session(pool_size=10, retries=2):
+    """A requests session with pooled keep-alive connections and retries on transient errors."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET", "HEAD"))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml,text/plain"})
+    return session
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of a page, stopping once enough has been read."""
+
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_depth or self.full:
+            return
+        text = " ".join(data.split())
+        if text:
+            self.parts.append(text + " ")
+            self.size += len(text) + 1
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+
+def extract_text(html, max_chars=MAX_TEXT_CHARS):
+    """Return the visible text of an HTML document, capped at max_chars."""
+    parser = _TextExtractor(max_chars)
+    # Feed in slices so a huge page stops being parsed once the cap is reached
+    for start in range(0, len(html), 65536):
+        parser.feed(html[start:start + 65536])
+        if parser.full:
+            break
+    text = "".join(parser.parts)
+    text = re.sub(r" *\n[\s]*", "\n", text).strip()
+    return text[:max_chars]
+
+
+def needs_javascript(html, text):
+    """Guess whether a page only renders its content in the browser."""
+    return len(text) < MIN_STATIC_CHARS and bool(_JS_REQUIRED.search(html) or html.count("<script") > 5)
+
+
+class WebPageToolSchema(BaseModel):
+    website_url: str = Field(..., description="Full URL of the website to read")
+
+
+# Shared by every agent so connections to the same hosts are reused
+http_session = build_session()
+_browser_tool = None
+_browser_lock = threading.Lock()
+
+
+def _browser():
+    global _browser_tool
+    with _browser_lock:
+        if _browser_tool is None:
+            from crewai_tools import SeleniumScrapingTool
+            _browser_tool = SeleniumScrapingTool()
+        return _browser_tool
+
+
+def _detect_encoding(response, is_html):
+    """
+    Set the response encoding when the Content-Type header has no charset.
+
+    requests then falls back to ISO-8859-1 for text/*, which garbles UTF-8
+    pages; the page's own <meta charset> is used instead, or a guess from
+    the content.
+    """
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        return
+    if is_html:
+        match = _META_CHARSET.search(response.content[:4096])
+        if match:
+            try:
+                response.encoding = codecs.lookup(match.group(1).decode("ascii")).name
+                return
+            except LookupError:
+                pass
+    response.encoding = response.apparent_encoding
+
+
+def fetch_page_text(url, max_chars=MAX_TEXT_CHARS):
+    """
+    Fetch a page over HTTP and return its visible text.
+
+    Falls back to the Selenium browser only when the page needs JavaScript
+    to render its content.
+
+    Args:
+        url (str): Page to read.
+        max_chars (int): Cap on the returned text.
+
+    Returns:
+        str: The page text.
+
+    Raises:
+        PageFetchError: When the page cannot be fetched or is not a web page.
+    """
+    try:
+        response = http_session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise PageFetchError(f"could not fetch {url}: {e}") from e
+
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type:
+        if content_type.startswith("text/"):
+            _detect_encoding(response, is_html=False)
+            return response.text[:max_chars]
+        raise PageFetchError(f"{url} is not a web page ({content_type or 'unknown content type'})")
+
+    _detect_encoding(response, is_html=True)
+    html = response.text
+    text = extract_text(html, max_chars)
+    if needs_javascript(html, text):
+        print(f"{url} needs JavaScript, reading it with the browser...")
+        return str(_browser()._run(website_url=url))[:max_chars]
+    return text
+
+
+class WebPageTool(BaseTool):
+    name: str = "Read website content"
+    description: str = "A tool that reads the text content of a website given its full URL."
+    args_schema: Type[BaseModel] = WebPageToolSchema
+    max_chars: int = MAX_TEXT_CHARS
+
+    def _run(self, **kwargs):
+        # Failures raise instead of returning a message: crewAI reports the error to
+        # the agent, and the research cache does not store it as the page's content
+        return fetch_page_text(kwargs["website_url"], self.max_chars)
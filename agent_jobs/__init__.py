@@ -0,0 +1,22 @@
+"""
+Shared job queue and worker runtime for the apps in this repo.
+
+    python -m agent_jobs submit recipe '{"query": "pasta carbonara"}' --priority 5
+    python -m agent_jobs submit-file trip trips.jsonl
+    python -m agent_jobs work --kinds recipe --processes 2
+    python -m agent_jobs work --kinds email trip --concurrency 4
+    python -m agent_jobs status 42
+    python -m agent_jobs stats
+
+Jobs live in a SQLite file (--db, default jobs.db), so workers on several
+machines can share it over a network file system that supports locking, and
+each kind of work can get its own number of processes.
+"""
+from .adapters import HANDLERS, submit_email, submit_meeting, submit_recipe, submit_trip
+from .job_queue import JobQueue
+from .worker import run_job, run_worker, run_workers
+
+__all__ = [
+    "HANDLERS", "JobQueue", "run_job", "run_worker", "run_workers",
+    "submit_email", "submit_meeting", "submit_recipe", "submit_trip",
+]
@@ -0,0 +1,73 @@
+import argparse
+import csv
+import json
+
+from .adapters import HANDLERS
+from .job_queue import JobQueue
+from .worker import run_workers
+
+
+def _read_payloads(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m agent_jobs", description="Queue and run agent jobs.")
+    arg_parser.add_argument("--db", default="jobs.db", help="Queue database file.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue one job.")
+    submit.add_argument("kind", choices=HANDLERS)
+    submit.add_argument("payload", help="JSON payload of the job.")
+    submit.add_argument("--priority", type=int, default=0)
+    submit.add_argument("--max-attempts", type=int, default=3)
+
+    submit_file = commands.add_parser("submit-file", help="Queue one job per JSONL line or CSV row.")
+    submit_file.add_argument("kind", choices=HANDLERS)
+    submit_file.add_argument("file")
+    submit_file.add_argument("--priority", type=int, default=0)
+    submit_file.add_argument("--max-attempts", type=int, default=3)
+
+    work = commands.add_parser("work", help="Run worker processes.")
+    work.add_argument("--kinds", nargs="+", choices=HANDLERS, default=list(HANDLERS))
+    work.add_argument("--processes", type=int, default=1)
+    work.add_argument("--concurrency", type=int, default=1, help="Jobs run at once by each process.")
+    work.add_argument("--poll-interval", type=float, default=1.0)
+    work.add_argument("--visibility-timeout", type=float, default=300,
+                      help="Seconds before the job of an unresponsive worker is handed to another.")
+
+    status = commands.add_parser("status", help="Show a job.")
+    status.add_argument("job_id", type=int)
+
+    commands.add_parser("stats", help="Job counts per kind and status.")
+
+    purge = commands.add_parser("purge", help="Delete old finished jobs.")
+    purge.add_argument("--days", type=float, default=7)
+
+    args = arg_parser.parse_args()
+    queue = JobQueue(args.db)
+
+    if args.command == "submit":
+        job_id = queue.submit(args.kind, json.loads(args.payload), args.priority, args.max_attempts)
+        print(f"Queued {args.kind} job {job_id}")
+    elif args.command == "submit-file":
+        payloads = _read_payloads(args.file)
+        for payload in payloads:
+            queue.submit(args.kind, payload, args.priority, args.max_attempts)
+        print(f"Queued {len(payloads)} {args.kind} jobs")
+    elif args.command == "work":
+        run_workers(args.db, args.kinds, args.processes, args.concurrency, args.poll_interval,
+                    args.visibility_timeout)
+    elif args.command == "status":
+        print(json.dumps(queue.get(args.job_id), indent=2))
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2))
+    elif args.command == "purge":
+        print(f"Deleted {queue.purge(args.days * 24 * 3600)} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Job handlers for the four apps, and helpers to submit their jobs.
+
+Every handler takes the job payload (a dict) and returns a JSON-serializable
+result. The apps are imported lazily, inside the worker process that runs
+them, with their own directory on sys.path (they import their sibling
+modules by name).
+"""
+import dataclasses
+import os
+import sys
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIRS = {
+    "email": "email_agent",
+    "meeting": "Meeting_Assistant",
+    "recipe": "Recipe_Generator",
+    "trip": "Vacation_Planner",
+}
+
+_recipe_lock = threading.Lock()
+
+
+def _use_app(kind):
+    path = os.path.join(REPO_ROOT, APP_DIRS[kind])
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def handle_email(payload):
+    """{"email": text or {"subject", "from", "body"}, "speculative": false} -> {"reply"}"""
+    _use_app("email")
+    from auto_email_responder_langgraph import reply_to_email
+
+    return {"reply": reply_to_email(payload["email"], verbose=False, speculative=payload.get("speculative", False))}
+
+
+def handle_meeting(payload):
+    """{"path": recording.mp3} -> {"meeting_id", "sinks"}"""
+    _use_app("meeting")
+    from meeting_assistant import get_meeting_id, process_meeting
+
+    results = process_meeting(payload["path"])
+    return {"meeting_id": get_meeting_id(payload["path"]),
+            "sinks": [dataclasses.asdict(result) for result in results]}
+
+
+def handle_recipe(payload):
+    """{"query", "refine": true} -> {"query", "recipe", "cached"} (or {"query", "draft"} without refine)"""
+    _use_app("recipe")
+    import recipe_model
+    from recipe_cache import RecipeStore
+    from Recipe_Generator_Bot import build_query, chain
+
+    query = build_query(payload["query"])
+    refine = payload.get("refine", True)
+    store = RecipeStore(os.getenv("RECIPE_DB", "recipes.db")) if refine else None
+    if store:
+        cached_recipe = store.get(query)
+        if cached_recipe:
+            return {"query": query, "recipe": cached_recipe, "cached": True}
+
+    # The model is loaded once per worker process and reused by every later job.
+    # Generation shares the tokenizer and the prompt prefix cache, so job slots take turns
+    with _recipe_lock:
+        if recipe_model.model is None:
+            recipe_model.init_model(mode=os.getenv("RECIPE_MODE", "fp32"))
+        draft = recipe_model.generate_recipe(query)
+    if not refine:
+        return {"query": query, "draft": draft}
+
+    recipe = chain.invoke({"recipe": draft, "query": query})
+    store.put(query, recipe)
+    return {"query": query, "recipe": recipe, "cached": False}
+
+
+def handle_trip(payload):
+    """{"origin", "city", "start_date", "num_days", "budget"} -> {"plan", "tokens"}"""
+    _use_app("trip")
+    from batch_planner import plan_trip
+
+    plan, tokens = plan_trip(payload, parallel=payload.get("parallel", True))
+    return {"plan": plan, "tokens": tokens}
+
+
+HANDLERS = {
+    "email": handle_email,
+    "meeting": handle_meeting,
+    "recipe": handle_recipe,
+    "trip": handle_trip,
+}
+
+
+def submit_email(queue, email, speculative=False, priority=0):
+    return queue.submit("email", {"email": email, "speculative": speculative}, priority=priority)
+
+
+def submit_meeting(queue, path, priority=0):
+    # Retrying re-sends the notifications, so meetings get a single retry
+    return queue.submit("meeting", {"path": os.path.abspath(path)}, priority=priority, max_attempts=2)
+
+
+def submit_recipe(queue, query, refine=True, priority=0):
+    return queue.submit("recipe", {"query": query, "refine": refine}, priority=priority)
+
+
+def submit_trip(queue, origin, city, start_date, num_days, budget, priority=0):
+    payload = {"origin": origin, "city": city, "start_date": start_date, "num_days": num_days, "budget": budget}
+    return queue.submit("trip", payload, priority=priority)
@@ -0,0 +1,212 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+class JobQueue:
+    def __init__(self, db_path="jobs.db", visibility_timeout=300, retry_backoff=5.0):
+        """
+        Durable job queue in a SQLite file, shared by any number of worker processes.
+
+        A claimed job is leased to its worker for visibility_timeout seconds.
+        Workers extend the lease while they run; if a worker dies the lease
+        runs out and the job is handed to another worker.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+            visibility_timeout (float): Seconds a claimed job stays invisible to other workers.
+            retry_backoff (float): Delay before the first retry, doubled on every further attempt.
+        """
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.retry_backoff = retry_backoff
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    available_at REAL NOT NULL,
+                    lease_expires REAL,
+                    worker TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (kind, status, priority DESC, available_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires);
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def submit(self, kind, payload, priority=0, max_attempts=3, delay=0):
+        """
+        Add a job.
+
+        Args:
+            kind (str): Which handler runs the job, e.g. "email" or "trip".
+            payload (dict): JSON-serializable handler input.
+            priority (int): Higher runs first.
+            max_attempts (int): Attempts before the job is marked failed.
+            delay (float): Seconds before the job becomes available.
+
+        Returns:
+            int: The job id.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO jobs (kind, payload, priority, max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (kind, json.dumps(payload), priority, max_attempts, now + delay, now, now),
+            )
+            return cursor.lastrowid
+
+    def claim(self, kinds, worker=None):
+        """
+        Lease the next available job of one of the given kinds.
+
+        Jobs whose lease expired count as available again, unless they have
+        used up their attempts, in which case they are marked failed.
+
+        Returns:
+            dict: The job, or None when nothing is available.
+        """
+        worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        placeholders = ",".join("?" * len(kinds))
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # Take the write lock up front so two workers cannot claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    f"""
+                    UPDATE jobs SET status = 'failed', error = 'lease expired on the last attempt',
+                        lease_expires = NULL, updated_at = ?
+                    WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts
+                        AND kind IN ({placeholders})
+                    """,
+                    (now, now, *kinds),
+                )
+                row = conn.execute(
+                    f"""
+                    SELECT id FROM jobs
+                    WHERE kind IN ({placeholders}) AND (
+                        (status = 'queued' AND available_at <= ?)
+                        OR (status = 'running' AND lease_expires < ?)
+                    )
+                    ORDER BY priority DESC, available_at, id
+                    LIMIT 1
+                    """,
+                    (*kinds, now, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                        lease_expires = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (worker, now + self.visibility_timeout, now, row["id"]),
+                )
+                job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self._job(job)
+
+    def _update_owned(self, job, sql, params):
+        """Run an UPDATE on the job only while this worker still holds its lease."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                sql + " WHERE id = ? AND worker = ? AND attempts = ? AND status = 'running'",
+                (*params, job["id"], job["worker"], job["attempts"]),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job):
+        """Extend the lease of a running job. Returns False if the lease was lost."""
+        now = time.time()
+        return self._update_owned(job, "UPDATE jobs SET lease_expires = ?, updated_at = ?",
+                                  (now + self.visibility_timeout, now))
+
+    def complete(self, job, result=None):
+        return self._update_owned(
+            job, "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ?",
+            (json.dumps(result), time.time()),
+        )
+
+    def fail(self, job, error):
+        """Record a failed attempt; the job is retried with backoff until it runs out of attempts."""
+        now = time.time()
+        if job["attempts"] >= job["max_attempts"]:
+            return self._update_owned(
+                job, "UPDATE jobs SET status = 'failed', error = ?, lease_expires = NULL, updated_at = ?",
+                (error, now),
+            )
+        delay = self.retry_backoff * 2 ** (job["attempts"] - 1)
+        return self._update_owned(
+            job,
+            "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, lease_expires = NULL, updated_at = ?",
+            (error, now + delay, now),
+        )
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def wait(self, job_id, timeout=None, poll_interval=0.5):
+        """Block until the job is done or failed and return it (None on timeout)."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in ("done", "failed"):
+                return job
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def stats(self):
+        """Number of jobs per kind and status."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status").fetchall()
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["kind"], dict.fromkeys(STATUSES, 0))[row["status"]] = row["n"]
+        return counts
+
+    def purge(self, older_than_seconds=7 * 24 * 3600):
+        """Delete finished jobs older than the given age."""
+        oldest = time.time() - older_than_seconds
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (oldest,)
+            ).rowcount
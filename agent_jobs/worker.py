@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from .adapters import HANDLERS
+from .job_queue import JobQueue
+
+
+def _keep_lease(queue, job, done, lost):
+    # Renew well before the lease runs out
+    interval = max(queue.visibility_timeout / 3, 1)
+    while not done.wait(interval):
+        if not queue.heartbeat(job):
+            lost.set()
+            return
+
+
+def run_job(queue, job, handlers=HANDLERS):
+    """Run one claimed job and record its result or error. Returns True on success."""
+    handler = handlers.get(job["kind"])
+    if handler is None:
+        queue.fail(job, f"No handler for job kind '{job['kind']}'")
+        return False
+
+    done, lost = threading.Event(), threading.Event()
+    heartbeat = threading.Thread(target=_keep_lease, args=(queue, job, done, lost), daemon=True)
+    heartbeat.start()
+    start = time.perf_counter()
+    try:
+        result = handler(job["payload"])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+        print(f"[{job['worker']}] job {job['id']} ({job['kind']}) failed on attempt {job['attempts']}: {e}")
+        queue.fail(job, error)
+        return False
+    finally:
+        done.set()
+        heartbeat.join()
+
+    if lost.is_set() or not queue.complete(job, result):
+        print(f"[{job['worker']}] job {job['id']} finished after its lease was lost; result discarded")
+        return False
+    print(f"[{job['worker']}] job {job['id']} ({job['kind']}) done in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+def run_worker(db_path, kinds, concurrency=1, poll_interval=1.0, visibility_timeout=300,
+               max_jobs=None, stop_event=None):
+    """
+    Claim and run jobs of the given kinds until stopped.
+
+    Args:
+        db_path (str): The queue database.
+        kinds (list): Job kinds this worker handles.
+        concurrency (int): Jobs run at the same time by this process (threads);
+            useful for jobs that mostly wait on remote LLM APIs.
+        poll_interval (float): Seconds to wait when the queue is empty.
+        visibility_timeout (float): Lease length of a claimed job.
+        max_jobs (int): Stop after this many jobs (per thread), None for no limit.
+        stop_event (threading.Event): Set to stop after the current jobs.
+    """
+    queue = JobQueue(db_path, visibility_timeout=visibility_timeout)
+    stop_event = stop_event or threading.Event()
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def loop(slot):
+        handled = 0
+        while not stop_event.is_set() and (max_jobs is None or handled < max_jobs):
+            job = queue.claim(kinds, f"{worker_name}/{slot}")
+            if job is None:
+                stop_event.wait(poll_interval)
+                continue
+            run_job(queue, job)
+            handled += 1
+
+    print(f"[{worker_name}] working on {', '.join(kinds)} with {concurrency} slot(s)")
+    threads = [threading.Thread(target=loop, args=(slot,), name=f"job-slot-{slot}") for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _worker_process(db_path, kinds, concurrency, poll_interval, visibility_timeout):
+    stop_event = threading.Event()
+    # Finish the running jobs on SIGTERM/Ctrl-C instead of dying mid-job
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    run_worker(db_path, kinds, concurrency, poll_interval, visibility_timeout, stop_event=stop_event)
+
+
+def run_workers(db_path, kinds, processes=1, concurrency=1, poll_interval=1.0, visibility_timeout=300):
+    """Start worker processes and wait for them; each one loads its app models once."""
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_worker_process,
+                        args=(db_path, kinds, concurrency, poll_interval, visibility_timeout))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,41 @@
+"""
+Record and replay the network traffic of any app in the repo.
+
+    python -m agent_replay --mode record --cassette runs/trip.json Vacation_Planner/vacation_planning_agent.py
+    python -m agent_replay --mode replay --cassette runs/trip.json Vacation_Planner/vacation_planning_agent.py
+
+or from code:
+
+    with use_cassette("runs/recipe.json", mode="replay"):
+        ...
+"""
+from contextlib import contextmanager
+
+from .cassette import Cassette, CassetteMiss
+from .transports import install
+
+__all__ = ["Cassette", "CassetteMiss", "install", "use_cassette"]
+
+
+@contextmanager
+def use_cassette(path, mode="replay", simulate_latency=False, latency_scale=1.0, match_body=True):
+    """
+    Record or replay every HTTP call made inside the block.
+
+    Args:
+        path (str): The cassette file, written on exit in record mode.
+        mode (str): "record" or "replay".
+        simulate_latency (bool): In replay, wait as long as each recorded call took.
+        latency_scale (float): Multiplier for the simulated latency.
+        match_body (bool): Match requests on their body as well as method and URL.
+
+    Yields:
+        Cassette: The active cassette.
+    """
+    cassette = Cassette(path, mode, simulate_latency, latency_scale, match_body)
+    _, uninstall = install(cassette)
+    try:
+        yield cassette
+    finally:
+        uninstall()
+        cassette.save()
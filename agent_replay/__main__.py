@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import runpy
+import sys
+import time
+
+from . import use_cassette
+
+# Keys the apps read at import time; in replay they only need to exist
+PLACEHOLDER_ENV = [
+    "GROQ_API_KEY", "OPENAI_API_KEY", "SERPER_API_KEY", "TAVILY_API_KEY",
+    "TRELLO_API_KEY", "TRELLO_API_SECRET", "TRELLO_API_TOKEN",
+]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m agent_replay",
+        description="Run a script with its HTTP traffic recorded to, or replayed from, a cassette."
+    )
+    arg_parser.add_argument("--mode", choices=["record", "replay"], required=True)
+    arg_parser.add_argument("--cassette", required=True, help="JSON cassette file.")
+    arg_parser.add_argument("--latency", action="store_true", help="Replay with the recorded latency of every call.")
+    arg_parser.add_argument("--latency-scale", type=float, default=1.0)
+    arg_parser.add_argument("--ignore-body", action="store_true",
+                            help="Match requests on method and URL only (for prompts that embed dates).")
+    arg_parser.add_argument("script", help="Python script to run.")
+    arg_parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the script.")
+    args = arg_parser.parse_args()
+
+    if args.mode == "replay":
+        for name in PLACEHOLDER_ENV:
+            os.environ.setdefault(name, "replay")
+
+    # Run the script the way `python script.py` would: its directory first on the path
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+
+    start = time.perf_counter()
+    with use_cassette(args.cassette, args.mode, args.latency, args.latency_scale, not args.ignore_body) as cassette:
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        finally:
+            summary = cassette.summary()
+            summary["wall_seconds"] = round(time.perf_counter() - start, 3)
+            print(f"[agent_replay] {args.mode}: {json.dumps(summary)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
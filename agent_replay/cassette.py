@@ -0,0 +1,229 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CASSETTE_VERSION = 1
+
+# Never written to a cassette
+SECRET_HEADERS = {"authorization", "api-key", "x-api-key", "cookie", "set-cookie", "proxy-authorization"}
+SECRET_PARAMS = {"key", "api_key", "apikey", "token", "access_token", "refresh_token", "id_token", "client_secret"}
+SECRET_BODY_FIELDS = {"api_key", "apikey", "token", "access_token", "refresh_token", "id_token", "client_secret"}
+# URL paths that carry a credential in a path segment: Discord webhooks end in their token
+SECRET_PATHS = [re.compile(r"^(/api(?:/v\d+)?/webhooks/\d+/)[^/]+")]
+# The stored body is already decoded, so these would describe it wrongly on replay
+_DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+REDACTED = "<redacted>"
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request the cassette has no recording of."""
+
+
+def redact_url(url):
+    parts = urlsplit(url)
+    path = parts.path
+    for pattern in SECRET_PATHS:
+        path = pattern.sub(lambda match: match.group(1) + REDACTED, path)
+    query = [(name, REDACTED if name.lower() in SECRET_PARAMS else value)
+             for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def _redact_json(value):
+    if isinstance(value, dict):
+        return {name: REDACTED if name.lower() in SECRET_BODY_FIELDS else _redact_json(item)
+                for name, item in value.items()}
+    if isinstance(value, list):
+        return [_redact_json(item) for item in value]
+    return value
+
+
+def _redact_form(text, content_type=None):
+    """Redacted form-encoded text, or None if the text is not a form body."""
+    is_form = "x-www-form-urlencoded" in (content_type or "").lower()
+    # Without a content type, only a body that parses strictly as name=value pairs is taken for a form
+    if not is_form and ("=" not in text or any(char.isspace() for char in text)):
+        return None
+    try:
+        fields = parse_qsl(text, keep_blank_values=True, strict_parsing=not is_form)
+    except ValueError:
+        return None
+    return urlencode([(name, REDACTED if name.lower() in SECRET_BODY_FIELDS else value) for name, value in fields])
+
+
+def normalize_body(body, content_type=None):
+    """
+    Body as text for matching and storage.
+
+    JSON is redacted and re-serialized with sorted keys, form-encoded bodies
+    are redacted field by field.
+    """
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        return json.dumps(_redact_json(json.loads(body)), sort_keys=True)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        return "base64:" + base64.b64encode(body).decode("ascii")
+    form = _redact_form(text, content_type)
+    return text if form is None else form
+
+
+def redact_content(content, content_type=None):
+    """Response body with the secret fields of a JSON or form-encoded body redacted, as bytes."""
+    try:
+        value = json.loads(content)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    else:
+        redacted = _redact_json(value)
+        # Only re-serialize when something was redacted, so other bodies replay byte for byte
+        return content if redacted == value else json.dumps(redacted).encode("utf-8")
+    if "x-www-form-urlencoded" in (content_type or "").lower():
+        form = _redact_form(content.decode("utf-8", "replace"), content_type)
+        if form is not None:
+            return form.encode("utf-8")
+    return content
+
+
+def _header(headers, name):
+    """Value of a header from a mapping or (name, value) pairs, ignoring case."""
+    if not headers:
+        return None
+    items = headers.items() if hasattr(headers, "items") else headers
+    for key, value in items:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _encode_content(content):
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_content(stored):
+    if "base64" in stored:
+        return base64.b64decode(stored["base64"])
+    return stored["text"].encode("utf-8")
+
+
+class Cassette:
+    def __init__(self, path, mode="replay", simulate_latency=False, latency_scale=1.0, match_body=True):
+        """
+        Recorded HTTP interactions of one run, stored as a JSON file.
+
+        In record mode every request made through a patched client is sent for
+        real and its response, timing and (redacted) request are appended. In
+        replay mode requests are answered from the file in the order they were
+        recorded, without touching the network.
+
+        Args:
+            path (str): The cassette file.
+            mode (str): "record" or "replay".
+            simulate_latency (bool): In replay, sleep for the recorded duration of each call.
+            latency_scale (float): Multiplier for the simulated latency.
+            match_body (bool): Include the request body when matching recordings.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        self.match_body = match_body
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._queues = defaultdict(deque)
+        self.misses = 0
+
+        if mode == "replay":
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"{path} is cassette version {data.get('version')}, expected {CASSETTE_VERSION}")
+            self.interactions = data["interactions"]
+            for interaction in self.interactions:
+                self._queues[self._key(interaction["request"])].append(interaction)
+
+    def _key(self, request):
+        key = f"{request['method']} {request['url']}"
+        if self.match_body:
+            key += " " + hashlib.sha256(request["body"].encode("utf-8")).hexdigest()
+        return key
+
+    @staticmethod
+    def request_record(method, url, body=None, headers=None):
+        """The redacted request as stored and matched; headers is only read for the content type."""
+        content_type = _header(headers, "content-type")
+        return {"method": method.upper(), "url": redact_url(url), "body": normalize_body(body, content_type)}
+
+    def record(self, transport, request, status, headers, content, started, elapsed):
+        """Append one real interaction; headers is an iterable of (name, value) pairs."""
+        headers = list(headers)
+        response = {
+            "status": status,
+            "headers": [[name, value] for name, value in headers
+                        if name.lower() not in SECRET_HEADERS | _DROPPED_RESPONSE_HEADERS],
+            **_encode_content(redact_content(content, _header(headers, "content-type"))),
+        }
+        with self._lock:
+            self.interactions.append({
+                "transport": transport,
+                "request": request,
+                "response": response,
+                "started": round(started - self._start, 4),
+                "elapsed": round(elapsed, 4),
+            })
+
+    def play(self, request):
+        """
+        Return (status, headers, content) recorded for the request.
+
+        Raises:
+            CassetteMiss: When no unused recording matches.
+        """
+        key = self._key(request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"No recording for {request['method']} {request['url']} in {self.path}")
+            # Keep the last recording so repeated identical calls still get an answer
+            interaction = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.simulate_latency:
+            time.sleep(interaction["elapsed"] * self.latency_scale)
+        response = interaction["response"]
+        return response["status"], [tuple(pair) for pair in response["headers"]], _decode_content(response)
+
+    def save(self):
+        if self.mode != "record":
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            interactions = sorted(self.interactions, key=lambda interaction: interaction["started"])
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": CASSETTE_VERSION, "interactions": interactions}, f, indent=1)
+
+    def summary(self):
+        total = sum(interaction["elapsed"] for interaction in self.interactions)
+        hosts = defaultdict(int)
+        for interaction in self.interactions:
+            hosts[urlsplit(interaction["request"]["url"]).netloc] += 1
+        return {"interactions": len(self.interactions), "network_seconds": round(total, 3),
+                "hosts": dict(hosts), "misses": self.misses}
@@ -0,0 +1,205 @@
+"""
+Patches that route every HTTP client used in the repo through a Cassette.
+
+    requests   Serper, Tavily, Trello, Discord, trip page fetches, the Hugging Face hub
+    httpx      the groq and openai SDKs (ChatGroq, ChatOpenAI), sync and async
+    httplib2   the Gmail API client
+    urllib     anything using urllib.request directly
+
+Clients that are not installed are skipped.
+"""
+import io
+import time
+from http import HTTPStatus
+from http.client import HTTPMessage
+
+from .cassette import Cassette
+
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _reason(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+def _replace(owner, name, replacement, undo):
+    original = getattr(owner, name)
+    setattr(owner, name, replacement)
+    undo.append(lambda: setattr(owner, name, original))
+    return original
+
+
+def patch_requests(cassette, undo):
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+    except ImportError:
+        return False
+
+    def build_response(request, status, headers, content):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = _reason(status)
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(content)
+        response._content = content
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+    def send(adapter, request, *args, **kwargs):
+        record = Cassette.request_record(request.method, request.url, request.body, request.headers)
+        if cassette.mode == "replay":
+            return build_response(request, *cassette.play(record))
+        started = time.perf_counter()
+        response = original(adapter, request, *args, **kwargs)
+        # Reading the body here keeps streamed responses usable: requests serves them from .content
+        content = response.content
+        cassette.record("requests", record, response.status_code, response.headers.items(), content,
+                        started, time.perf_counter() - started)
+        return response
+
+    original = _replace(HTTPAdapter, "send", send, undo)
+    return True
+
+
+def patch_httpx(cassette, undo):
+    try:
+        import httpx
+    except ImportError:
+        return False
+
+    def build_response(request, status, headers, content):
+        headers = [(name, value) for name, value in headers if name.lower() not in _DROPPED_HEADERS]
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    def handle_request(transport, request):
+        record = Cassette.request_record(request.method, str(request.url), request.read(), request.headers)
+        if cassette.mode == "replay":
+            return build_response(request, *cassette.play(record))
+        started = time.perf_counter()
+        response = original_sync(transport, request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        cassette.record("httpx", record, response.status_code, response.headers.multi_items(), content,
+                        started, time.perf_counter() - started)
+        return build_response(request, response.status_code, response.headers.multi_items(), content)
+
+    async def handle_async_request(transport, request):
+        record = Cassette.request_record(request.method, str(request.url), await request.aread(), request.headers)
+        if cassette.mode == "replay":
+            return build_response(request, *cassette.play(record))
+        started = time.perf_counter()
+        response = await original_async(transport, request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        cassette.record("httpx", record, response.status_code, response.headers.multi_items(), content,
+                        started, time.perf_counter() - started)
+        return build_response(request, response.status_code, response.headers.multi_items(), content)
+
+    original_sync = _replace(httpx.HTTPTransport, "handle_request", handle_request, undo)
+    original_async = _replace(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request, undo)
+    return True
+
+
+def patch_httplib2(cassette, undo):
+    try:
+        import httplib2
+    except ImportError:
+        return False
+
+    def request(http, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        record = Cassette.request_record(method, uri, body, headers)
+        if cassette.mode == "replay":
+            status, response_headers, content = cassette.play(record)
+            return httplib2.Response({**dict(response_headers), "status": str(status)}), content
+        started = time.perf_counter()
+        response, content = original(http, uri, method, body, headers, *args, **kwargs)
+        response_headers = [(name, value) for name, value in response.items() if name != "status"]
+        cassette.record("httplib2", record, response.status, response_headers, content,
+                        started, time.perf_counter() - started)
+        return response, content
+
+    original = _replace(httplib2.Http, "request", request, undo)
+    return True
+
+
+def patch_urllib(cassette, undo):
+    import urllib.error
+    import urllib.request
+    from urllib.response import addinfourl
+
+    def message(headers):
+        result = HTTPMessage()
+        for name, value in headers:
+            result[name] = value
+        return result
+
+    def open_url(opener, fullurl, data=None, *args, **kwargs):
+        if isinstance(fullurl, urllib.request.Request):
+            url, method, body = fullurl.full_url, fullurl.get_method(), data or fullurl.data
+            if data is not None and fullurl.method is None:
+                method = "POST"
+            headers = fullurl.header_items()
+        else:
+            url, method, body, headers = fullurl, "POST" if data is not None else "GET", data, None
+        record = Cassette.request_record(method, url, body, headers)
+
+        if cassette.mode == "replay":
+            status, headers, content = cassette.play(record)
+            headers = message(headers)
+            if status >= 400:
+                raise urllib.error.HTTPError(url, status, _reason(status), headers, io.BytesIO(content))
+            return addinfourl(io.BytesIO(content), headers, url, status)
+
+        started = time.perf_counter()
+        try:
+            response = original(opener, fullurl, data, *args, **kwargs)
+        except urllib.error.HTTPError as e:
+            content = e.read()
+            cassette.record("urllib", record, e.code, e.headers.items(), content, started, time.perf_counter() - started)
+            raise urllib.error.HTTPError(e.url, e.code, e.msg, e.headers, io.BytesIO(content)) from e
+        with response:
+            content = response.read()
+        cassette.record("urllib", record, response.status, response.headers.items(), content,
+                        started, time.perf_counter() - started)
+        return addinfourl(io.BytesIO(content), response.headers, response.url, response.status)
+
+    original = _replace(urllib.request.OpenerDirector, "open", open_url, undo)
+    return True
+
+
+PATCHES = {
+    "requests": patch_requests,
+    "httpx": patch_httpx,
+    "httplib2": patch_httplib2,
+    "urllib": patch_urllib,
+}
+
+
+def install(cassette):
+    """
+    Route every installed HTTP client through the cassette.
+
+    Returns:
+        tuple: (names of the patched clients, function undoing the patches)
+    """
+    undo = []
+    patched = [name for name, patch in PATCHES.items() if patch(cassette, undo)]
+
+    def uninstall():
+        while undo:
+            undo.pop()()
+
+    return patched, uninstall
@@ -31,6 +31,9 @@ from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.output_parsers import JsonOutputParser
 
+# Prompts are compiled to compact chat messages; research is rendered within a token budget
+from prompt_compiler import compile_prompt, render_research
+
 """## Utils"""
 
 def write_markdown_file(content, filename):
@@ -79,7 +82,7 @@ prompt = PromptTemplate(
     input_variables=["initial_email"],
 )
 
-email_category_generator = prompt | GROQ_LLM | StrOutputParser()
+email_category_generator = compile_prompt(prompt) | GROQ_LLM | StrOutputParser()
 
 
 ## Example
@@ -117,7 +120,7 @@ research_router_prompt = PromptTemplate(
     input_variables=["initial_email","email_category"],
 )
 
-research_router = research_router_prompt | GROQ_LLM | JsonOutputParser()
+research_router = compile_prompt(research_router_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -141,7 +144,7 @@ search_keyword_prompt = PromptTemplate(
     input_variables=["initial_email","email_category"],
 )
 
-search_keyword_chain = search_keyword_prompt | GROQ_LLM | JsonOutputParser()
+search_keyword_chain = compile_prompt(search_keyword_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -175,7 +178,7 @@ draft_writer_prompt = PromptTemplate(
     input_variables=["initial_email","email_category","research_info"],
 )
 
-draft_writer_chain = draft_writer_prompt | GROQ_LLM | JsonOutputParser()
+draft_writer_chain = compile_prompt(draft_writer_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -205,7 +208,7 @@ rewrite_router_prompt = PromptTemplate(
     input_variables=["initial_email","email_category","draft_email"],
 )
 
-rewrite_router = rewrite_router_prompt | GROQ_LLM | JsonOutputParser()
+rewrite_router = compile_prompt(rewrite_router_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -239,7 +242,7 @@ draft_analysis_prompt = PromptTemplate(
     input_variables=["initial_email","email_category","research_info"],
 )
 
-draft_analysis_chain = draft_analysis_prompt | GROQ_LLM | JsonOutputParser()
+draft_analysis_chain = compile_prompt(draft_analysis_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -278,7 +281,7 @@ rewrite_email_prompt = PromptTemplate(
                      ],
 )
 
-rewrite_chain = rewrite_email_prompt | GROQ_LLM | JsonOutputParser()
+rewrite_chain = compile_prompt(rewrite_email_prompt) | GROQ_LLM | JsonOutputParser()
 
 ## Example
 # email_category = 'customer_feedback'
@@ -403,7 +406,7 @@ def draft_email_writer(state):
     # Generate draft email
     draft_email = draft_writer_chain.invoke({"initial_email": initial_email,
                                      "email_category": email_category,
-                                     "research_info":research_info})
+                                     "research_info":render_research(research_info)})
     # print("Draft Email:", draft_email)
     # print(type(draft_email))
 
@@ -425,7 +428,7 @@ def analyze_draft_email(state):
     # Generate draft email
     draft_email_feedback = draft_analysis_chain.invoke({"initial_email": initial_email,
                                                 "email_category": email_category,
-                                                "research_info":research_info,
+                                                "research_info":render_research(research_info),
                                                 "draft_email":draft_email}
                                                )
     # print(draft_email)
@@ -448,7 +451,7 @@ def rewrite_email(state):
     # Generate draft email
     final_email = rewrite_chain.invoke({"initial_email": initial_email,
                                                 "email_category": email_category,
-                                                "research_info":research_info,
+                                                "research_info":render_research(research_info),
                                                 "draft_email":draft_email,
                                                 "email_analysis": draft_email_feedback}
                                                )
@@ -531,80 +534,130 @@ def route_to_rewrite(state):
         print("---ROUTE EMAIL TO FINAL EMAIL---")
         return "no_rewrite"
 
-"""## Build the Graph"""
-
-"""## Add Nodes"""
-
-workflow = StateGraph(GraphState)
-
-# Define the nodes
-workflow.add_node("categorize_email", categorize_email) # categorize email
-workflow.add_node("research_info_search", research_info_search) # web search
-workflow.add_node("state_printer", state_printer)
-workflow.add_node("draft_email_writer", draft_email_writer)
-workflow.add_node("analyze_draft_email", analyze_draft_email)
-workflow.add_node("rewrite_email", rewrite_email)
-workflow.add_node("no_rewrite", no_rewrite)
-
-"""### Add Edges"""
-
-workflow.set_entry_point("categorize_email")
-
-workflow.add_conditional_edges(
-    "categorize_email",
-    route_to_research,
-    {
-        "research_info": "research_info_search",
-        "draft_email": "draft_email_writer",
-    },
-)
-workflow.add_edge("research_info_search", "draft_email_writer")
+"""## Speculative Drafting
 
+Most emails need no research. In speculative mode a draft without research is
+written while the research router (and, if it asks for it, the web search)
+runs; the draft is used as is when no research is needed or the search finds
+nothing, and discarded otherwise.
+"""
 
-workflow.add_conditional_edges(
-    "draft_email_writer",
-    route_to_rewrite,
-    {
-        "rewrite": "analyze_draft_email",
-        "no_rewrite": "no_rewrite",
-    },
-)
-workflow.add_edge("analyze_draft_email", "rewrite_email")
-workflow.add_edge("no_rewrite", "state_printer")
-workflow.add_edge("rewrite_email", "state_printer")
-workflow.add_edge("state_printer", END)
+from concurrent.futures import ThreadPoolExecutor
 
-# Compile
-app = workflow.compile()
+def has_research(research_info):
+    return bool(research_info) and any(doc.page_content.strip() for doc in research_info)
 
-from gmail_client import GmailClient
+def speculative_draft(state):
+    print("---SPECULATIVE DRAFT---")
+    pool = ThreadPoolExecutor(max_workers=1)
+    draft_future = pool.submit(draft_email_writer, {**state, "research_info": None})
+    try:
+        decision = route_to_research(state)
+        research_info = None
+        if decision == "research_info":
+            research_info = research_info_search(state)["research_info"]
 
-# Initialize the GmailClient
-gmail_client = GmailClient(credentials_file='credentials.json', token_file='token.json')
+        if not has_research(research_info):
+            print("---USING SPECULATIVE DRAFT---")
+            draft = draft_future.result()
+        else:
+            print("---DISCARDING SPECULATIVE DRAFT, DRAFTING WITH RESEARCH---")
+            # A running LLM call cannot be interrupted, its result is simply not waited for
+            draft_future.cancel()
+            draft = draft_email_writer({**state, "research_info": research_info})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
-# Fetch the latest email
-latest_email = gmail_client.fetch_latest_email()
+    return {"draft_email": draft["draft_email"],
+            "research_info": research_info,
+            "num_steps": state["num_steps"] + 2}
 
-recipient_address = latest_email['from']
+"""## Build the Graph"""
 
-if latest_email:
-    # print("Subject:", latest_email['subject'])
-    # print("From:", latest_email['from'])
-    # print("Body:", latest_email['body'])
-    print("Working...")
-else:
-    print("No email available.")
+def build_workflow(speculative=False):
+    """
+    Build and compile the email graph.
 
-# run the agent
-inputs = {"initial_email": latest_email,"research_info": None, "num_steps":0}
-for output in app.stream(inputs):
-    for key, value in output.items():
-        print(f"Finished running: {key}:")
+    Args:
+        speculative (bool): Draft without research while routing and researching,
+            see speculative_draft().
+    """
+    workflow = StateGraph(GraphState)
+
+    # Add Nodes
+
+    # Define the nodes
+    workflow.add_node("categorize_email", categorize_email) # categorize email
+    workflow.add_node("state_printer", state_printer)
+    workflow.add_node("analyze_draft_email", analyze_draft_email)
+    workflow.add_node("rewrite_email", rewrite_email)
+    workflow.add_node("no_rewrite", no_rewrite)
+
+    # Add Edges
+
+    workflow.set_entry_point("categorize_email")
+
+    if speculative:
+        workflow.add_node("speculative_draft", speculative_draft)
+        workflow.add_edge("categorize_email", "speculative_draft")
+        draft_node = "speculative_draft"
+    else:
+        workflow.add_node("research_info_search", research_info_search) # web search
+        workflow.add_node("draft_email_writer", draft_email_writer)
+        workflow.add_conditional_edges(
+            "categorize_email",
+            route_to_research,
+            {
+                "research_info": "research_info_search",
+                "draft_email": "draft_email_writer",
+            },
+        )
+        workflow.add_edge("research_info_search", "draft_email_writer")
+        draft_node = "draft_email_writer"
+
+    workflow.add_conditional_edges(
+        draft_node,
+        route_to_rewrite,
+        {
+            "rewrite": "analyze_draft_email",
+            "no_rewrite": "no_rewrite",
+        },
+    )
+    workflow.add_edge("analyze_draft_email", "rewrite_email")
+    workflow.add_edge("no_rewrite", "state_printer")
+    workflow.add_edge("rewrite_email", "state_printer")
+    workflow.add_edge("state_printer", END)
+
+    # Compile
+    return workflow.compile()
+
+app = build_workflow()
+speculative_app = build_workflow(speculative=True)
+
+def reply_to_email(initial_email, verbose=True, speculative=False):
+    """
+    Run the email graph on one customer email and return the reply.
 
-output = app.invoke(inputs)
+    Args:
+        initial_email: The customer email, as text or the dict returned by
+            GmailClient.fetch_latest_email().
+        verbose (bool): Print each finished node.
+        speculative (bool): Use the speculative drafting graph.
 
-print("-----Final Email-----")
-print(output['final_email'])
+    Returns:
+        str: The final reply.
+    """
+    inputs = {"initial_email": initial_email, "research_info": None, "num_steps": 0}
+    # Collect the state from the stream instead of running the graph a second time
+    final_state = dict(inputs)
+    graph = speculative_app if speculative else app
+    for output in graph.stream(inputs):
+        for key, value in output.items():
+            if verbose:
+                print(f"Finished running: {key}:")
+            if value:
+                final_state.update(value)
+    return final_state['final_email']
 
 
 changer_prompt = PromptTemplate(
@@ -629,22 +682,66 @@ Final Email JSON:""",
     input_variables=["email_draft", "changes"]
 )
 
-changer_chain = changer_prompt | GROQ_LLM | JsonOutputParser()
-
-decision = ''
-
-while decision not in ['yes', 'no']:
+changer_chain = compile_prompt(changer_prompt) | GROQ_LLM | JsonOutputParser()
+
+# Every prompt, for prompt_compiler.py's size report
+PROMPTS = {
+    "categorize_email": prompt,
+    "research_router": research_router_prompt,
+    "search_keywords": search_keyword_prompt,
+    "draft_writer": draft_writer_prompt,
+    "rewrite_router": rewrite_router_prompt,
+    "draft_analysis": draft_analysis_prompt,
+    "rewrite_email": rewrite_email_prompt,
+    "changer": changer_prompt,
+}
+
+if __name__ == "__main__":
+    import argparse
+    from gmail_client import GmailClient
+
+    arg_parser = argparse.ArgumentParser(description="Reply to the latest email in the inbox.")
+    arg_parser.add_argument("--speculative", action="store_true",
+                            help="Draft without research while the research router and search run.")
+    args = arg_parser.parse_args()
+
+    # Initialize the GmailClient
+    gmail_client = GmailClient(credentials_file='credentials.json', token_file='token.json')
+
+    # Fetch the latest email
+    latest_email = gmail_client.fetch_latest_email()
+
+    if latest_email:
+        # print("Subject:", latest_email['subject'])
+        # print("From:", latest_email['from'])
+        # print("Body:", latest_email['body'])
+        print("Working...")
+    else:
+        print("No email available.")
+        raise SystemExit(1)
+
+    recipient_address = latest_email['from']
+
+    # run the agent
+    output = {"final_email": reply_to_email(latest_email, speculative=args.speculative)}
+
+    print("-----Final Email-----")
     print(output['final_email'])
-    decision = input("Do you want to send this email (yes/no) or suggest any changes in the email: ")
-    if decision == 'yes':
-        print("Sending email...")
-        # Send the email
-        gmail_client.send_email(recipient_address, "Reply to: " + latest_email['subject'], output['final_email'])
-    elif decision == 'no':
-        print("Email not sent.")
-    else:  # suggest changes
-        print("Incorporating changes...")
-        # Send the email
-        output = changer_chain.invoke({"email_draft": output['final_email'], "changes": decision})
-
-write_markdown_file(final_email['final_email'], "final_email")
+
+    decision = ''
+
+    while decision not in ['yes', 'no']:
+        print(output['final_email'])
+        decision = input("Do you want to send this email (yes/no) or suggest any changes in the email: ")
+        if decision == 'yes':
+            print("Sending email...")
+            # Send the email
+            gmail_client.send_email(recipient_address, "Reply to: " + latest_email['subject'], output['final_email'])
+        elif decision == 'no':
+            print("Email not sent.")
+        else:  # suggest changes
+            print("Incorporating changes...")
+            # Send the email
+            output = changer_chain.invoke({"email_draft": output['final_email'], "changes": decision})
+
+    write_markdown_file(output['final_email'], "final_email")
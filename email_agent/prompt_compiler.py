@@ -0,0 +1,167 @@
+"""
+Compile the hand-written Llama-3 prompt templates into compact chat prompts.
+
+The templates embed the Llama-3 special tokens themselves, are indented like
+the code around them and receive research as the repr of a list of Documents.
+ChatGroq applies the model's chat template on its own, so here:
+
+- the special tokens become system/user messages of a ChatPromptTemplate,
+- indentation, line continuations, runs of blank lines and repeated lines are removed,
+- research documents are rendered as plain text capped at a token budget.
+
+    python prompt_compiler.py --log prompt_sizes.jsonl
+
+prints the token count of every prompt before and after compilation (and
+appends it to the log to track prompt size over time).
+"""
+import json
+import re
+import time
+
+from langchain_core.prompts import ChatPromptTemplate
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+RESEARCH_TOKEN_BUDGET = 600
+
+_HEADER = re.compile(r"<\|start_header_id\|>\s*(\w+)\s*<\|end_header_id\|>")
+_SPECIAL_TOKEN = re.compile(r"<\|[a-z_]+\|>")
+_ROLES = {"system": "system", "user": "human", "assistant": "ai"}
+
+
+def count_tokens(text):
+    """Token count with the cl100k encoding (an approximation for Llama-3), or ~4 characters per token."""
+    if _encoding is None:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def normalize_text(text):
+    """Strip indentation and line continuations, and drop repeated lines and extra blank lines."""
+    lines, seen = [], set()
+    for line in text.split("\n"):
+        line = " ".join(line.split()).rstrip("\\").rstrip()
+        # Only sentences count as repeats, not short lines like the braces of a JSON example
+        if len(line) > 30:
+            if line in seen:
+                continue
+            seen.add(line)
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def split_llama3_messages(template):
+    """
+    Split a template with Llama-3 header tokens into (role, text) messages.
+
+    A template without header tokens is a single user message. The empty
+    assistant header that ends a Llama-3 prompt is dropped.
+    """
+    headers = list(_HEADER.finditer(template))
+    if not headers:
+        return [("human", normalize_text(_SPECIAL_TOKEN.sub("", template)))]
+
+    messages = []
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(template)
+        text = normalize_text(_SPECIAL_TOKEN.sub("", template[header.end():end]))
+        if text:
+            messages.append((_ROLES.get(header.group(1), "human"), text))
+    return messages
+
+
+def compile_prompt(prompt):
+    """
+    Turn a PromptTemplate written in raw Llama-3 format into a compact ChatPromptTemplate.
+
+    Args:
+        prompt (PromptTemplate): The original prompt.
+
+    Returns:
+        ChatPromptTemplate: The same instructions and variables as chat messages.
+    """
+    return ChatPromptTemplate.from_messages(split_llama3_messages(prompt.template))
+
+
+def render_research(research_info, max_tokens=RESEARCH_TOKEN_BUDGET):
+    """
+    Render research documents as compact text within a token budget.
+
+    Args:
+        research_info: None, a list of Documents (or strings), or a string.
+        max_tokens (int): Budget for the whole rendering.
+
+    Returns:
+        str: The document texts separated by blank lines, "None" without research.
+    """
+    if not research_info:
+        return "None"
+    if isinstance(research_info, str):
+        research_info = [research_info]
+
+    parts, used = [], 0
+    for doc in research_info:
+        text = " ".join(str(getattr(doc, "page_content", doc)).split())
+        if not text:
+            continue
+        size = count_tokens(text)
+        if used + size > max_tokens:
+            remaining = max_tokens - used
+            if remaining > 20:
+                # Cut the last document by its share of characters
+                parts.append(text[:len(text) * remaining // size].rsplit(" ", 1)[0] + " ...")
+            break
+        parts.append(text)
+        used += size
+    return "\n\n".join(parts) or "None"
+
+
+def prompt_sizes(prompts):
+    """
+    Token counts of prompt templates before and after compilation.
+
+    Args:
+        prompts (dict): Name -> PromptTemplate.
+
+    Returns:
+        dict: Name -> {"raw_tokens", "compiled_tokens"}, counted on the template text.
+    """
+    sizes = {}
+    for name, prompt in prompts.items():
+        compiled = "\n".join(text for _, text in split_llama3_messages(prompt.template))
+        sizes[name] = {"raw_tokens": count_tokens(prompt.template), "compiled_tokens": count_tokens(compiled)}
+    return sizes
+
+
+def print_prompt_sizes(sizes):
+    raw_total = sum(size["raw_tokens"] for size in sizes.values())
+    compiled_total = sum(size["compiled_tokens"] for size in sizes.values())
+    for name, size in sizes.items():
+        print(f"{name:<28} {size['raw_tokens']:>5} -> {size['compiled_tokens']:>5} tokens")
+    print(f"{'total':<28} {raw_total:>5} -> {compiled_total:>5} tokens")
+
+
+def main():
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Report the token size of the email prompts.")
+    arg_parser.add_argument("--log", default=None, help="JSON Lines file to append the report to.")
+    args = arg_parser.parse_args()
+
+    from auto_email_responder_langgraph import PROMPTS
+
+    sizes = prompt_sizes(PROMPTS)
+    print_prompt_sizes(sizes)
+    if args.log:
+        with open(args.log, "a") as f:
+            f.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "prompts": sizes}) + "\n")
+
+
+if __name__ == "__main__":
+    main()